@@ -16,6 +16,10 @@ ENV_FILE_PATH = BASE_DIR / ".env"
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Асинхронный стек (AsyncSession, async-роутеры клиентов, дел и таймшитов).
+    # URL по умолчанию выводится из DATABASE_URL: postgresql -> asyncpg, sqlite -> aiosqlite
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DATABASE_URL: str | None = None
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
@@ -27,6 +31,19 @@ class Settings(BaseSettings):
     FERNET_KEY: str 
     CELERY_BROKER_URL: str | None = None
     CELERY_RESULT_BACKEND: str | None = None
+    CELERY_TASK_ALWAYS_EAGER: bool = False  # выполнять задачи синхронно (тесты)
+
+    # Очередь синхронизации с Google Calendar (calendar_outbox)
+    CALENDAR_OUTBOX_BATCH_SIZE: int = 50      # записей на сотрудника за один проход
+    CALENDAR_OUTBOX_MAX_ATTEMPTS: int = 8     # после этого запись помечается failed
+    CALENDAR_OUTBOX_POLL_SECONDS: float = 15.0
+    # Как часто подтягивать изменения из Google Calendar (syncToken)
+    CALENDAR_RECONCILE_INTERVAL_SECONDS: int = 300
+
+    # Индекс ставок в памяти перечитывается не реже, чем раз в столько секунд
+    RATE_INDEX_TTL_SECONDS: int = 60
+    # Шаг округления часов в счёте (вверх), 0.1 ч = 6 минут; 0 — без округления
+    BILLING_HOURS_INCREMENT: float = 0.1
 
     class Config:
         # 3. Передаем абсолютный путь (преобразуем в строку)
@@ -0,0 +1,57 @@
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Generic, Type, TypeVar
+from app.utils.pagination import paginate_async
+
+ModelType = TypeVar("ModelType")
+
+# Асинхронный аналог CRUDBase для AsyncSession (см. ASYNC_DB_ENABLED).
+# Методы и их смысл те же, запросы строятся через select().
+
+class AsyncCRUDBase(Generic[ModelType]):
+    cursor_columns: tuple[str, ...] = ("id",)
+    cursor_descending: bool = False
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> ModelType | None:
+        return await db.scalar(select(self.model).where(self.model.id == id))
+
+    async def get_multi(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> list[ModelType]:
+        result = await db.scalars(select(self.model).order_by(self.model.id).offset(skip).limit(limit))
+        return list(result.all())
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        cursor: str | None = None,
+        limit: int = 100,
+        statement: Select | None = None,
+    ) -> tuple[list[ModelType], str | None]:
+        """Страница по курсору: (записи, курсор следующей страницы)"""
+        columns = [getattr(self.model, name) for name in self.cursor_columns]
+        statement = statement if statement is not None else select(self.model)
+        return await paginate_async(db, statement, columns, cursor, limit, descending=self.cursor_descending)
+
+    async def create(self, db: AsyncSession, obj_in: dict) -> ModelType:
+        db_obj = self.model(**obj_in)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(self, db: AsyncSession, db_obj: ModelType, obj_in: dict) -> ModelType:
+        for field, value in obj_in.items():
+            setattr(db_obj, field, value)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, id: Any) -> ModelType:
+        obj = await self.get(db, id)
+        if not obj:
+            raise ValueError(f"{self.model.__name__} with id {id} not found")
+        await db.delete(obj)
+        await db.commit()
+        return obj
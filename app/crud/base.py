@@ -1,9 +1,14 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, Query
 from typing import Any, Generic, Type, TypeVar
+from app.utils.pagination import paginate
 
 ModelType = TypeVar("ModelType")
 
 class CRUDBase(Generic[ModelType]):
+    # Ключи стабильной сортировки для keyset-пагинации (последний — уникальный id)
+    cursor_columns: tuple[str, ...] = ("id",)
+    cursor_descending: bool = False
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
@@ -11,7 +16,19 @@ class CRUDBase(Generic[ModelType]):
         return db.query(self.model).filter(self.model.id == id).first()
 
     def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> list[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return db.query(self.model).order_by(self.model.id).offset(skip).limit(limit).all()
+
+    def get_page(
+        self,
+        db: Session,
+        cursor: str | None = None,
+        limit: int = 100,
+        query: Query | None = None,
+    ) -> tuple[list[ModelType], str | None]:
+        """Страница по курсору: (записи, курсор следующей страницы)"""
+        columns = [getattr(self.model, name) for name in self.cursor_columns]
+        query = query if query is not None else db.query(self.model)
+        return paginate(query, columns, cursor, limit, descending=self.cursor_descending)
 
     def create(self, db: Session, obj_in: dict) -> ModelType:
         db_obj = self.model(**obj_in)
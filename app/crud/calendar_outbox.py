@@ -0,0 +1,122 @@
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from app.crud.base import CRUDBase
+from app.models.calendar_outbox import CalendarOutbox, OutboxOperation, OutboxStatus
+
+# Пауза перед повтором растёт экспоненциально, но не больше часа
+RETRY_BASE_SECONDS = 15
+RETRY_MAX_SECONDS = 3600
+
+class CRUDCalendarOutbox(CRUDBase[CalendarOutbox]):
+    def add(
+        self,
+        db: Session,
+        *,
+        employee_id: int,
+        time_entry_id: int,
+        operation: OutboxOperation,
+        google_event_id: str | None = None,
+    ) -> CalendarOutbox:
+        """Добавить запись в текущую транзакцию (без коммита)"""
+        db_obj = CalendarOutbox(
+            employee_id=employee_id,
+            time_entry_id=time_entry_id,
+            operation=operation,
+            google_event_id=google_event_id,
+            status=OutboxStatus.pending,
+            attempts=0,
+            next_retry_at=datetime.utcnow(),
+            created_at=datetime.utcnow(),
+        )
+        db.add(db_obj)
+        return db_obj
+
+    def add_many(self, db: Session, rows: list[dict]) -> None:
+        """
+        Несколько записей одним INSERT (без коммита).
+        rows — словари с employee_id, time_entry_id, operation и, для delete, google_event_id.
+        """
+        if not rows:
+            return
+        now = datetime.utcnow()
+        db.execute(insert(CalendarOutbox), [
+            {
+                "google_event_id": None,
+                **row,
+                "status": OutboxStatus.pending,
+                "attempts": 0,
+                "next_retry_at": now,
+                "created_at": now,
+            }
+            for row in rows
+        ])
+
+    def get_due_employee_ids(self, db: Session, now: datetime) -> list[int]:
+        rows = (
+            db.query(CalendarOutbox.employee_id)
+            .filter(
+                CalendarOutbox.status == OutboxStatus.pending,
+                CalendarOutbox.next_retry_at <= now,
+            )
+            .distinct()
+            .all()
+        )
+        return [row[0] for row in rows]
+
+    def lock_batch(self, db: Session, employee_id: int, now: datetime, limit: int) -> list[CalendarOutbox]:
+        """Забрать до limit ожидающих записей сотрудника; занятые другим диспетчером пропускаются"""
+        return (
+            db.query(CalendarOutbox)
+            .filter(
+                CalendarOutbox.employee_id == employee_id,
+                CalendarOutbox.status == OutboxStatus.pending,
+                CalendarOutbox.next_retry_at <= now,
+            )
+            .order_by(CalendarOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def mark_done(self, rows: list[CalendarOutbox], now: datetime, status: OutboxStatus = OutboxStatus.done):
+        for row in rows:
+            row.status = status
+            row.attempts += 1
+            row.last_error = None
+            row.processed_at = now
+
+    def mark_failed(self, rows: list[CalendarOutbox], now: datetime, error: str, max_attempts: int):
+        for row in rows:
+            row.attempts += 1
+            row.last_error = error
+            if row.attempts >= max_attempts:
+                row.status = OutboxStatus.failed
+                row.processed_at = now
+            else:
+                delay = min(RETRY_BASE_SECONDS * 2 ** (row.attempts - 1), RETRY_MAX_SECONDS)
+                row.next_retry_at = now + timedelta(seconds=delay)
+
+    def stats(self, db: Session) -> dict:
+        """Размер очереди по статусам и возраст самой старой ожидающей записи"""
+        counts = dict(
+            db.query(CalendarOutbox.status, func.count(CalendarOutbox.id))
+            .group_by(CalendarOutbox.status)
+            .all()
+        )
+        oldest = (
+            db.query(func.min(CalendarOutbox.created_at))
+            .filter(CalendarOutbox.status == OutboxStatus.pending)
+            .scalar()
+        )
+        return {
+            "pending": counts.get(OutboxStatus.pending, 0),
+            "failed": counts.get(OutboxStatus.failed, 0),
+            "done": counts.get(OutboxStatus.done, 0),
+            "skipped": counts.get(OutboxStatus.skipped, 0),
+            "oldest_pending_age_seconds": (
+                (datetime.utcnow() - oldest).total_seconds() if oldest else None
+            ),
+        }
+
+calendar_outbox = CRUDCalendarOutbox(CalendarOutbox)
@@ -1,8 +1,17 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
 from app.models.client import Client
+from app.models.contract import Contract
 from app.schemas.client import ClientCreate
 
 class CRUDClient(CRUDBase[Client]):
     pass
 
-client = CRUDClient(Client)
\ No newline at end of file
+class AsyncCRUDClient(AsyncCRUDBase[Client]):
+    async def count_contracts(self, db: AsyncSession, client_id: int) -> int:
+        return await db.scalar(select(func.count()).select_from(Contract).where(Contract.client_id == client_id))
+
+client = CRUDClient(Client)
+client_async = AsyncCRUDClient(Client)
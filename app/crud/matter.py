@@ -1,3 +1,4 @@
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
 from app.models.matter import Matter
 from app.schemas.matter import MatterCreate
@@ -5,4 +6,8 @@ from app.schemas.matter import MatterCreate
 class CRUDMatter(CRUDBase[Matter]):
     pass
 
-matter = CRUDMatter(Matter)
\ No newline at end of file
+class AsyncCRUDMatter(AsyncCRUDBase[Matter]):
+    pass
+
+matter = CRUDMatter(Matter)
+matter_async = AsyncCRUDMatter(Matter)
@@ -1,8 +1,322 @@
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, Query
+from typing import Any
+from datetime import date
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
-from app.models.time_entry import TimeEntry
-from app.schemas.time_entry import TimeEntryCreate
+from app.utils.pagination import paginate, paginate_async
+from app.crud.calendar_outbox import calendar_outbox
+from app.crud.time_entry_daily_rollup import time_entry_daily_rollup, rollup_key, merge_delta
+from app.models.calendar_outbox import OutboxOperation
+from app.models.time_entry import TimeEntry, TimeEntryStatus
+from app.models.matter import Matter
+from app.models.contract import Contract
+from app.models.activity_type import ActivityType
+from app.schemas.time_entry import TimeEntryCreate, TimeEntryFilter, TimeEntryListFilter
+
+# Каждое изменение таймшита пишет запись в calendar_outbox в той же транзакции,
+# поэтому синхронизация с календарём не теряется при падении процесса.
+# Там же обновляется дневная свёртка time_entry_daily_rollup (дельтой).
 
 class CRUDTimeEntry(CRUDBase[TimeEntry]):
-    pass
+    # Свежие записи первыми
+    cursor_columns = ("date", "id")
+    cursor_descending = True
+
+    # Допустимые ключи сортировки списка -> колонки keyset-курсора
+    sort_columns = {
+        "date": ("date", "id"),
+        "hours": ("hours", "id"),
+        "id": ("id",),
+    }
+
+    def filter_query(
+        self, db: Session, filters: TimeEntryFilter, query: Query | None = None, model=TimeEntry
+    ) -> Query:
+        """
+        Условия фильтра в виде одного SQL-запроса (дело/договор/клиент — подзапросом по matters).
+        model — TimeEntry или таблица с теми же колонками (дневная свёртка).
+        """
+        query = query if query is not None else db.query(model)
+        if filters.employee_id is not None:
+            query = query.filter(model.employee_id == filters.employee_id)
+        if filters.date_from is not None:
+            query = query.filter(model.date >= filters.date_from)
+        if filters.date_to is not None:
+            query = query.filter(model.date <= filters.date_to)
+        if filters.status is not None:
+            query = query.filter(model.status == filters.status)
+        if filters.activity_type_id is not None:
+            query = query.filter(model.activity_type_id == filters.activity_type_id)
+        if filters.matter_id is not None:
+            query = query.filter(model.matter_id == filters.matter_id)
+        if filters.contract_id is not None:
+            query = query.filter(model.matter_id.in_(
+                select(Matter.id).where(Matter.contract_id == filters.contract_id)
+            ))
+        if filters.client_id is not None:
+            query = query.filter(model.matter_id.in_(
+                select(Matter.id)
+                .join(Contract, Contract.id == Matter.contract_id)
+                .where(Contract.client_id == filters.client_id)
+            ))
+        return query
+
+    def get_filtered_page(
+        self,
+        db: Session,
+        filters: TimeEntryListFilter,
+        cursor: str | None = None,
+        limit: int = 100,
+        query: Query | None = None,
+    ) -> tuple[list[TimeEntry], str | None]:
+        """Страница списка с фильтрами; курсор строится по выбранной сортировке"""
+        descending = filters.sort.startswith("-")
+        columns = [getattr(TimeEntry, name) for name in self.sort_columns[filters.sort.lstrip("-")]]
+        return paginate(self.filter_query(db, filters, query), columns, cursor, limit, descending=descending)
+
+    def create(self, db: Session, obj_in: dict) -> TimeEntry:
+        db_obj = TimeEntry(**obj_in)
+        db.add(db_obj)
+        db.flush()  # нужен id для outbox
+        time_entry_daily_rollup.add_entries(db, [db_obj])
+        calendar_outbox.add(
+            db, employee_id=db_obj.employee_id, time_entry_id=db_obj.id,
+            operation=OutboxOperation.upsert,
+        )
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(self, db: Session, db_obj: TimeEntry, obj_in: dict) -> TimeEntry:
+        old_key, old_hours = rollup_key(db_obj), db_obj.hours
+        for field, value in obj_in.items():
+            setattr(db_obj, field, value)
+        time_entry_daily_rollup.move_entry(db, old_key, old_hours, db_obj)
+        calendar_outbox.add(
+            db, employee_id=db_obj.employee_id, time_entry_id=db_obj.id,
+            operation=OutboxOperation.upsert,
+        )
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def approve(self, db: Session, db_obj: TimeEntry) -> TimeEntry:
+        old_key = rollup_key(db_obj)
+        db_obj.status = TimeEntryStatus.approved
+        time_entry_daily_rollup.move_entry(db, old_key, db_obj.hours, db_obj)
+        calendar_outbox.add(
+            db, employee_id=db_obj.employee_id, time_entry_id=db_obj.id,
+            operation=OutboxOperation.upsert,
+        )
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def remove(self, db: Session, id: Any) -> TimeEntry:
+        # Блокировка строки: диспетчер мог как раз создавать событие,
+        # дожидаемся его и читаем актуальный google_event_id
+        obj = db.query(TimeEntry).filter(TimeEntry.id == id).with_for_update().first()
+        if not obj:
+            raise ValueError(f"TimeEntry with id {id} not found")
+        calendar_outbox.add(
+            db, employee_id=obj.employee_id, time_entry_id=obj.id,
+            operation=OutboxOperation.delete, google_event_id=obj.google_event_id,
+        )
+        time_entry_daily_rollup.add_entries(db, [obj], sign=-1)
+        db.delete(obj)
+        db.commit()
+        return obj
+
+    # --- Пакетные операции: один коммит и постоянное число запросов на пакет ---
+
+    def get_many(self, db: Session, ids: list[int], for_update: bool = False) -> dict[int, TimeEntry]:
+        query = db.query(TimeEntry).filter(TimeEntry.id.in_(ids))
+        if for_update:
+            query = query.order_by(TimeEntry.id).with_for_update()
+        return {entry.id: entry for entry in query.all()}
+
+    def _reload(self, db: Session, ids: list[int]) -> list[TimeEntry]:
+        """После коммита объекты просрочены — перечитываем их одним SELECT, а не refresh по каждому"""
+        if not ids:
+            return []
+        by_id = {entry.id: entry for entry in db.query(TimeEntry).filter(TimeEntry.id.in_(ids)).all()}
+        return [by_id[id] for id in ids]
+
+    def create_many(self, db: Session, rows: list[dict]) -> list[TimeEntry]:
+        """Вставка одним INSERT ... RETURNING; порядок результата совпадает с rows"""
+        if not rows:
+            return []
+        entries = list(db.scalars(
+            insert(TimeEntry).returning(TimeEntry, sort_by_parameter_order=True), rows
+        ))
+        time_entry_daily_rollup.add_entries(db, entries)
+        calendar_outbox.add_many(db, [
+            {"employee_id": entry.employee_id, "time_entry_id": entry.id, "operation": OutboxOperation.upsert}
+            for entry in entries
+        ])
+        ids = [entry.id for entry in entries]
+        db.commit()
+        return self._reload(db, ids)
+
+    def update_many(self, db: Session, changes: list[tuple[TimeEntry, dict]]) -> list[TimeEntry]:
+        """Применить правки к загруженным записям; UPDATE уходят одним flush"""
+        if not changes:
+            return []
+        deltas = {}
+        for db_obj, obj_in in changes:
+            merge_delta(deltas, rollup_key(db_obj), -db_obj.hours, -1)
+            for field, value in obj_in.items():
+                setattr(db_obj, field, value)
+            merge_delta(deltas, rollup_key(db_obj), db_obj.hours, 1)
+        db.flush()
+        time_entry_daily_rollup.apply_deltas(db, deltas)
+        calendar_outbox.add_many(db, [
+            {"employee_id": db_obj.employee_id, "time_entry_id": db_obj.id, "operation": OutboxOperation.upsert}
+            for db_obj, _ in changes
+        ])
+        ids = [db_obj.id for db_obj, _ in changes]
+        db.commit()
+        return self._reload(db, ids)
+
+    def remove_many(self, db: Session, entries: list[TimeEntry]) -> list[TimeEntry]:
+        """Удалить записи (загруженные через get_many(for_update=True)) одним DELETE"""
+        if not entries:
+            return []
+        time_entry_daily_rollup.add_entries(db, entries, sign=-1)
+        calendar_outbox.add_many(db, [
+            {
+                "employee_id": entry.employee_id, "time_entry_id": entry.id,
+                "operation": OutboxOperation.delete, "google_event_id": entry.google_event_id,
+            }
+            for entry in entries
+        ])
+        # Отсоединяем объекты: их состояние нужно для ответа, а строки удаляет DELETE
+        for entry in entries:
+            db.expunge(entry)
+        db.execute(
+            delete(TimeEntry)
+            .where(TimeEntry.id.in_([entry.id for entry in entries]))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return entries
+
+    def approve_many(self, db: Session, filters: TimeEntryFilter, ids: list[int] | None = None) -> list:
+        """
+        Одобрить черновики по фильтру (и списку id) одним UPDATE ... RETURNING.
+        Возвращает строки (id, employee_id, matter_id, activity_type_id, date, hours) одобренных записей.
+        """
+        criteria = [TimeEntry.status == TimeEntryStatus.draft]
+        where = self.filter_query(db, filters).whereclause
+        if where is not None:
+            criteria.append(where)
+        if ids:
+            criteria.append(TimeEntry.id.in_(ids))
+        rows = db.execute(
+            update(TimeEntry)
+            .where(*criteria)
+            .values(status=TimeEntryStatus.approved)
+            .returning(
+                TimeEntry.id, TimeEntry.employee_id, TimeEntry.matter_id,
+                TimeEntry.activity_type_id, TimeEntry.date, TimeEntry.hours,
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+
+        deltas = {}
+        for row in rows:
+            key = (row.employee_id, row.matter_id, row.activity_type_id, TimeEntryStatus.draft, row.date)
+            merge_delta(deltas, key, -row.hours, -1)
+            merge_delta(deltas, key[:3] + (TimeEntryStatus.approved, row.date), row.hours, 1)
+        time_entry_daily_rollup.apply_deltas(db, deltas)
+        calendar_outbox.add_many(db, [
+            {"employee_id": row.employee_id, "time_entry_id": row.id, "operation": OutboxOperation.upsert}
+            for row in rows
+        ])
+        db.commit()
+        return rows
+
+    # --- Выборки синхронизации с календарём (индексы — см. модель TimeEntry) ---
+
+    def get_unsynced_with_refs(self, db: Session, employee_id: int) -> list[tuple]:
+        """Таймшиты сотрудника без события вместе с делом и типом активности"""
+        return (
+            db.query(TimeEntry, Matter, ActivityType)
+            .join(Matter, Matter.id == TimeEntry.matter_id)
+            .join(ActivityType, ActivityType.id == TimeEntry.activity_type_id)
+            .filter(
+                TimeEntry.employee_id == employee_id,
+                TimeEntry.google_event_id.is_(None),
+            )
+            .order_by(TimeEntry.id)
+            .all()
+        )
+
+    def get_by_event_ids(self, db: Session, employee_id: int, event_ids: list[str]) -> list[TimeEntry]:
+        return (
+            db.query(TimeEntry)
+            .filter(
+                TimeEntry.employee_id == employee_id,
+                TimeEntry.google_event_id.in_(event_ids),
+            )
+            .all()
+        )
+
+    def get_synced_with_refs(
+        self, db: Session, employee_id: int, date_from: date, date_to: date, limit: int
+    ) -> list[tuple]:
+        """Таймшиты сотрудника с событием в календаре за период"""
+        return (
+            db.query(TimeEntry, Matter, ActivityType)
+            .join(Matter, Matter.id == TimeEntry.matter_id)
+            .join(ActivityType, ActivityType.id == TimeEntry.activity_type_id)
+            .filter(
+                TimeEntry.employee_id == employee_id,
+                TimeEntry.google_event_id.isnot(None),
+                TimeEntry.date >= date_from,
+                TimeEntry.date <= date_to,
+            )
+            .order_by(TimeEntry.date, TimeEntry.id)
+            .limit(limit)
+            .all()
+        )
+
+
+class AsyncCRUDTimeEntry(AsyncCRUDBase[TimeEntry]):
+    """
+    Чтение — своими запросами через select(); изменения выполняются
+    синхронным CRUDTimeEntry внутри AsyncSession.run_sync, чтобы свёртка
+    и calendar_outbox обновлялись той же логикой и в той же транзакции.
+    """
+    cursor_columns = CRUDTimeEntry.cursor_columns
+    cursor_descending = CRUDTimeEntry.cursor_descending
+
+    async def get_filtered_page(
+        self,
+        db: AsyncSession,
+        filters: TimeEntryListFilter,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[list[TimeEntry], str | None]:
+        descending = filters.sort.startswith("-")
+        columns = [getattr(TimeEntry, name) for name in CRUDTimeEntry.sort_columns[filters.sort.lstrip("-")]]
+        # filter_query с готовым запросом сессию не использует — подходит и для select()
+        statement = time_entry.filter_query(None, filters, query=select(TimeEntry))
+        return await paginate_async(db, statement, columns, cursor, limit, descending=descending)
+
+    async def create(self, db: AsyncSession, obj_in: dict) -> TimeEntry:
+        return await db.run_sync(time_entry.create, obj_in)
+
+    async def update(self, db: AsyncSession, db_obj: TimeEntry, obj_in: dict) -> TimeEntry:
+        return await db.run_sync(time_entry.update, db_obj, obj_in)
+
+    async def approve(self, db: AsyncSession, db_obj: TimeEntry) -> TimeEntry:
+        return await db.run_sync(time_entry.approve, db_obj)
+
+    async def remove(self, db: AsyncSession, id: Any) -> TimeEntry:
+        return await db.run_sync(time_entry.remove, id)
 
-time_entry = CRUDTimeEntry(TimeEntry)
\ No newline at end of file
+time_entry = CRUDTimeEntry(TimeEntry)
+time_entry_async = AsyncCRUDTimeEntry(TimeEntry)
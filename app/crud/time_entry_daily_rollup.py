@@ -0,0 +1,124 @@
+from sqlalchemy import func, insert, delete, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.time_entry import TimeEntry, TimeEntryStatus
+from app.models.time_entry_daily_rollup import TimeEntryDailyRollup
+
+# Дневная свёртка таймшитов. Обновляется дельтами в той же транзакции,
+# что и сам таймшит: +часы при создании, −старый ключ/+новый при правке,
+# −часы при удалении. Полный пересчёт — rebuild(), сверка — check().
+
+KEY_COLUMNS = ("employee_id", "matter_id", "activity_type_id", "status", "date")
+# Погрешность сравнения сумм часов (float накапливает ошибку округления)
+HOURS_TOLERANCE = 1e-6
+
+
+def rollup_key(entry) -> tuple:
+    return (
+        entry.employee_id, entry.matter_id, entry.activity_type_id,
+        TimeEntryStatus(entry.status), entry.date,
+    )
+
+
+def merge_delta(deltas: dict, key: tuple, hours: float, entries: int) -> None:
+    """Накопить дельту по ключу: несколько изменений — одна строка upsert"""
+    total_hours, total_entries = deltas.get(key, (0.0, 0))
+    deltas[key] = (total_hours + hours, total_entries + entries)
+
+
+class CRUDTimeEntryDailyRollup(CRUDBase[TimeEntryDailyRollup]):
+    def _upsert(self, db: Session):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(TimeEntryDailyRollup)
+        if dialect == "sqlite":
+            return sqlite.insert(TimeEntryDailyRollup)
+        raise NotImplementedError(f"Rollup upsert is not supported for {dialect}")
+
+    def apply_deltas(self, db: Session, deltas: dict[tuple, tuple[float, int]]) -> None:
+        """Прибавить (часы, записи) к строкам свёртки по ключам (без коммита)"""
+        deltas = {key: delta for key, delta in deltas.items() if delta[1] or abs(delta[0]) > HOURS_TOLERANCE}
+        if not deltas:
+            return
+        stmt = self._upsert(db)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={
+                "hours": TimeEntryDailyRollup.hours + stmt.excluded.hours,
+                "entries": TimeEntryDailyRollup.entries + stmt.excluded.entries,
+            },
+        )
+        # Ключи в фиксированном порядке — параллельные транзакции
+        # блокируют строки свёртки одинаково и не ловят дедлок
+        rows = [
+            {**dict(zip(KEY_COLUMNS, key)), "hours": hours, "entries": entries}
+            for key, (hours, entries) in sorted(deltas.items(), key=lambda item: tuple(map(str, item[0])))
+        ]
+        db.execute(stmt, rows)
+
+        # Опустевшие строки удаляем, чтобы свёртка не росла
+        emptied = [key for key, (_, entries) in deltas.items() if entries < 0]
+        if emptied:
+            key = tuple_(*[getattr(TimeEntryDailyRollup, column) for column in KEY_COLUMNS])
+            db.execute(
+                delete(TimeEntryDailyRollup)
+                .where(key.in_(emptied), TimeEntryDailyRollup.entries <= 0)
+                .execution_options(synchronize_session=False)
+            )
+
+    def add_entries(self, db: Session, entries: list, sign: int = 1) -> None:
+        """Учесть (sign=1) или вычесть (sign=-1) таймшиты"""
+        deltas = {}
+        for entry in entries:
+            merge_delta(deltas, rollup_key(entry), sign * entry.hours, sign)
+        self.apply_deltas(db, deltas)
+
+    def move_entry(self, db: Session, old_key: tuple, old_hours: float, entry: TimeEntry) -> None:
+        """Перенести таймшит со старого ключа/часов на текущие"""
+        deltas = {}
+        merge_delta(deltas, old_key, -old_hours, -1)
+        merge_delta(deltas, rollup_key(entry), entry.hours, 1)
+        self.apply_deltas(db, deltas)
+
+    def _base_totals_query(self, db: Session):
+        key = [getattr(TimeEntry, column) for column in KEY_COLUMNS]
+        return db.query(
+            *key, func.sum(TimeEntry.hours), func.count(TimeEntry.id)
+        ).filter(TimeEntry.status.isnot(None)).group_by(*key)
+
+    def rebuild(self, db: Session) -> int:
+        """Пересчитать свёртку с нуля из time_entries (одна транзакция)"""
+        db.execute(delete(TimeEntryDailyRollup))
+        source = self._base_totals_query(db).statement
+        db.execute(
+            insert(TimeEntryDailyRollup).from_select([*KEY_COLUMNS, "hours", "entries"], source)
+        )
+        db.commit()
+        return db.query(TimeEntryDailyRollup).count()
+
+    def check(self, db: Session, limit: int = 100) -> list[dict]:
+        """Расхождения свёртки с time_entries: [{key, expected, actual}]"""
+        expected = {
+            tuple(row[:5]): (float(row[5]), int(row[6]))
+            for row in self._base_totals_query(db)
+        }
+        actual = {
+            rollup_key(row): (row.hours, row.entries)
+            for row in db.query(TimeEntryDailyRollup)
+        }
+        mismatches = []
+        for key in sorted(expected.keys() | actual.keys(), key=lambda k: tuple(map(str, k))):
+            want = expected.get(key, (0.0, 0))
+            have = actual.get(key, (0.0, 0))
+            if want[1] != have[1] or abs(want[0] - have[0]) > HOURS_TOLERANCE:
+                mismatches.append({
+                    "key": dict(zip(KEY_COLUMNS, key)),
+                    "expected": {"hours": want[0], "entries": want[1]},
+                    "actual": {"hours": have[0], "entries": have[1]},
+                })
+                if len(mismatches) >= limit:
+                    break
+        return mismatches
+
+time_entry_daily_rollup = CRUDTimeEntryDailyRollup(TimeEntryDailyRollup)
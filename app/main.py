@@ -5,13 +5,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from pathlib import Path
 import time
-from app.routers import auth, client, contract, matter, time_entry, employee, activity_type
+from app.routers import auth, client, contract, matter, time_entry, employee, activity_type, report, billing
 from app.config import settings
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, async_engine
 from app.models.employee import Employee
 from app.utils.auth import get_current_user
-from app.utils.google_calendar import get_google_oauth_flow, encrypt_token
+from app.utils.google_calendar import (
+    get_google_oauth_flow,
+    encrypt_token,
+    encrypt_credentials,
+    invalidate_calendar_client,
+)
 import json
 
 # Определяем путь к статическим файлам
@@ -31,6 +36,8 @@ async def lifespan(app: FastAPI):
     print("========================\n")
     yield
     # Shutdown
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(
     title="LegalTime", 
@@ -58,6 +65,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # курсор следующей страницы списков
 )
 
 # API роутеры
@@ -66,13 +74,22 @@ app.add_middleware(
 app.include_router(auth.router)
 # 2. С префиксом /api для фронтенда (/api/auth/login)
 app.include_router(auth.router, prefix="/api")
-# Остальные роутеры только с префиксом /api
+# Остальные роутеры только с префиксом /api.
+# С ASYNC_DB_ENABLED async-версии подключаются раньше синхронных и перехватывают
+# совпадающие маршруты; остальное (пакетные операции, выгрузка) обслуживают синхронные
+if settings.ASYNC_DB_ENABLED:
+    from app.routers import client_async, matter_async, time_entry_async
+    app.include_router(client_async.router, prefix="/api")
+    app.include_router(matter_async.router, prefix="/api")
+    app.include_router(time_entry_async.router, prefix="/api")
 app.include_router(client.router, prefix="/api")
 app.include_router(contract.router, prefix="/api")
 app.include_router(matter.router, prefix="/api")
 app.include_router(time_entry.router, prefix="/api")
 app.include_router(employee.router, prefix="/api")
 app.include_router(activity_type.router, prefix="/api")
+app.include_router(report.router, prefix="/api")
+app.include_router(billing.router, prefix="/api")
 
 # Статические файлы (CSS, JS, изображения)
 if STATIC_DIR.exists():
@@ -114,17 +131,12 @@ def google_callback_no_prefix(
         credentials = flow.credentials
         
         # Сохраняем токены в зашифрованном виде
-        token_data = {
-            'token': credentials.token,
-            'token_uri': credentials.token_uri,
-            'client_id': credentials.client_id,
-            'client_secret': credentials.client_secret,
-            'scopes': credentials.scopes
-        }
-        
-        user.google_token_encrypted = encrypt_token(json.dumps(token_data))
+        user.google_token_encrypted = encrypt_credentials(credentials)
         if credentials.refresh_token:
             user.google_refresh_token_encrypted = encrypt_token(credentials.refresh_token)
+        # Календарь мог смениться — следующая сверка будет полной
+        user.google_sync_token = None
+        invalidate_calendar_client(user.id)
         
         # Создаем отдельный календарь LegalTime, если его еще нет
         if not user.google_calendar_id:
@@ -4,4 +4,6 @@ from .matter import Matter
 from .activity_type import ActivityType
 from .rate import Rate
 from .employee import Employee
-from .time_entry import TimeEntry
\ No newline at end of file
+from .time_entry import TimeEntry
+from .calendar_outbox import CalendarOutbox
+from .time_entry_daily_rollup import TimeEntryDailyRollup
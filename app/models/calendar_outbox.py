@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Index
+from .base import BaseModel
+from datetime import datetime
+import enum
+
+class OutboxOperation(str, enum.Enum):
+    upsert = "upsert"  # создать или обновить событие по текущему состоянию таймшита
+    delete = "delete"
+
+class OutboxStatus(str, enum.Enum):
+    pending = "pending"
+    done = "done"
+    failed = "failed"    # исчерпаны попытки
+    skipped = "skipped"  # календарь сотрудника не подключён
+
+class CalendarOutbox(BaseModel):
+    """Отложенные изменения календаря, записанные в одной транзакции с таймшитом"""
+    __tablename__ = "calendar_outbox"
+
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    # Без внешнего ключа: запись на удаление переживает сам таймшит
+    time_entry_id = Column(Integer, nullable=False)
+    operation = Column(Enum(OutboxOperation), nullable=False)
+    google_event_id = Column(String, nullable=True)  # для delete: событие на момент удаления
+
+    status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_retry_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Выборка диспетчера: ожидающие записи сотрудника в порядке появления
+        Index("ix_calendar_outbox_status_employee_id", "status", "employee_id", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Enum
+from sqlalchemy import Column, String, DateTime, Enum
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 import enum
@@ -20,6 +20,8 @@ class Employee(BaseModel):
     google_token_encrypted = Column(String, nullable=True)
     google_refresh_token_encrypted = Column(String, nullable=True)
     google_calendar_id = Column(String, nullable=True)  # ID календаря для синхронизации
+    google_sync_token = Column(String, nullable=True)  # nextSyncToken для инкрементальной сверки
+    google_synced_at = Column(DateTime, nullable=True)  # время последней сверки с календарём
 
     # Строковая ссылка — SQLAlchemy найдёт класс позже
     time_entries = relationship("TimeEntry", back_populates="employee")
\ No newline at end of file
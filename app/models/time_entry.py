@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, Text, Date, Enum, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, Text, Date, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 import enum
@@ -23,4 +23,25 @@ class TimeEntry(BaseModel):
 
     # Строковая ссылка
     employee = relationship("Employee", back_populates="time_entries")
-    matter = relationship("Matter", back_populates="time_entries")
\ No newline at end of file
+    matter = relationship("Matter", back_populates="time_entries")
+
+    __table_args__ = (
+        # Keyset-пагинация: ORDER BY date DESC, id DESC (свои записи и общий список)
+        Index("ix_time_entries_employee_id_date_id", "employee_id", "date", "id"),
+        Index("ix_time_entries_date_id", "date", "id"),
+        # Выгрузка в календарь: записи сотрудника без события (частичный индекс)
+        Index(
+            "ix_time_entries_employee_id_unsynced", "employee_id", "id",
+            postgresql_where=google_event_id.is_(None),
+            sqlite_where=google_event_id.is_(None),
+        ),
+        # Сверка с календарём: поиск таймшита по событию
+        Index(
+            "ix_time_entries_employee_id_google_event_id", "employee_id", "google_event_id",
+            postgresql_where=google_event_id.isnot(None),
+            sqlite_where=google_event_id.isnot(None),
+        ),
+        # Отчёты по делу за период и выборки по статусу
+        Index("ix_time_entries_matter_id_date", "matter_id", "date"),
+        Index("ix_time_entries_status_date", "status", "date"),
+    )
\ No newline at end of file
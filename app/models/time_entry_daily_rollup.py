@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, Float, Date, Enum, ForeignKey, UniqueConstraint, Index
+from .base import BaseModel
+from .time_entry import TimeEntryStatus
+
+class TimeEntryDailyRollup(BaseModel):
+    """Сумма часов за день в разрезе сотрудник × дело × вид работ × статус"""
+    __tablename__ = "time_entry_daily_rollup"
+
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    matter_id = Column(Integer, ForeignKey("matters.id", ondelete="CASCADE"), nullable=False)
+    activity_type_id = Column(Integer, ForeignKey("activity_types.id", ondelete="CASCADE"), nullable=False)
+    status = Column(Enum(TimeEntryStatus), nullable=False)
+    date = Column(Date, nullable=False)
+
+    hours = Column(Float, nullable=False, default=0)
+    entries = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Ключ дельта-обновлений (INSERT ... ON CONFLICT)
+        UniqueConstraint(
+            "employee_id", "matter_id", "activity_type_id", "status", "date",
+            name="uq_time_entry_daily_rollup_key",
+        ),
+        # Отчёты за период по всем сотрудникам
+        Index("ix_time_entry_daily_rollup_date", "date"),
+        Index("ix_time_entry_daily_rollup_matter_id_date", "matter_id", "date"),
+    )
@@ -1,21 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.crud.activity_type import activity_type as crud_activity_type
 from app.schemas.activity_type import ActivityType, ActivityTypeCreate
 from app.utils.auth import get_current_user
+from app.utils.pagination import set_next_cursor
 
 router = APIRouter(prefix="/activity-types", tags=["activity-types"])
 
 @router.get("/", response_model=list[ActivityType])
 def read_activity_types(
-    skip: int = 0,
+    response: Response,
+    cursor: str | None = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """Получить список всех типов активности"""
-    return crud_activity_type.get_multi(db, skip=skip, limit=limit)
+    activity_types, next_cursor = crud_activity_type.get_page(db, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return activity_types
 
 @router.get("/{activity_type_id}", response_model=ActivityType)
 def read_activity_type(
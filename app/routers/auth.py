@@ -10,7 +10,12 @@ from app.models.client import Client
 from app.utils.auth import authenticate_user, create_access_token
 from app.config import settings
 from fastapi.security import OAuth2PasswordRequestFormStrict  # <-- новый импорт
-from app.utils.google_calendar import get_google_oauth_flow, encrypt_token
+from app.utils.google_calendar import (
+    get_google_oauth_flow,
+    encrypt_token,
+    encrypt_credentials,
+    invalidate_calendar_client,
+)
 import json
 
 
@@ -116,17 +121,12 @@ def google_callback(
         credentials = flow.credentials
         
         # Сохраняем токены в зашифрованном виде
-        token_data = {
-            'token': credentials.token,
-            'token_uri': credentials.token_uri,
-            'client_id': credentials.client_id,
-            'client_secret': credentials.client_secret,
-            'scopes': credentials.scopes
-        }
-        
-        user.google_token_encrypted = encrypt_token(json.dumps(token_data))
+        user.google_token_encrypted = encrypt_credentials(credentials)
         if credentials.refresh_token:
             user.google_refresh_token_encrypted = encrypt_token(credentials.refresh_token)
+        # Календарь мог смениться — следующая сверка будет полной
+        user.google_sync_token = None
+        invalidate_calendar_client(user.id)
         
         # Создаем отдельный календарь LegalTime, если его еще нет
         if not user.google_calendar_id:
@@ -155,7 +155,10 @@ def google_disconnect(
     current_user.google_token_encrypted = None
     current_user.google_refresh_token_encrypted = None
     current_user.google_calendar_id = None
+    current_user.google_sync_token = None
+    current_user.google_synced_at = None
     db.commit()
+    invalidate_calendar_client(current_user.id)
     
     return {"message": "Google Calendar disconnected successfully"}
 
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import date
+from app.database import get_db
+from app.crud.client import client as crud_client
+from app.models.employee import Employee
+from app.schemas.billing import BillingPreview
+from app.utils.auth import get_current_user
+from app.utils.billing import billing_preview
+from app.config import settings
+
+router = APIRouter(prefix="/billing", tags=["billing"])
+
+@router.get("/preview", response_model=BillingPreview)
+def read_billing_preview(
+    client_id: int,
+    date_from: date = Query(alias="from"),
+    date_to: date = Query(alias="to"),
+    include_drafts: bool = False,
+    increment: float = Query(default=settings.BILLING_HOURS_INCREMENT, ge=0, le=1),
+    db: Session = Depends(get_db),
+    current_user: Employee = Depends(get_current_user)
+):
+    """Предпросмотр счёта клиенту за период: суммы и подытоги по делам, договорам и сотрудникам"""
+    if current_user.role not in ["admin", "senior_lawyer"]:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be later than 'to'")
+    db_client = crud_client.get(db, client_id)
+    if db_client is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return billing_preview(db, db_client, date_from, date_to, include_drafts, increment)
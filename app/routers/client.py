@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.crud.client import client as crud_client
 from app.schemas.client import Client, ClientCreate
 from app.utils.auth import get_current_admin_user, get_current_user
+from app.utils.pagination import set_next_cursor
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
@@ -17,13 +18,15 @@ def create_client(
 
 @router.get("/", response_model=list[Client])
 def read_clients(
-    skip: int = 0,
+    response: Response,
+    cursor: str | None = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)  # Все авторизованные могут читать
 ):
     """Получить список клиентов - доступно всем авторизованным пользователям"""
-    clients = crud_client.get_multi(db, skip=skip, limit=limit)
+    clients, next_cursor = crud_client.get_page(db, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
     return clients
 
 @router.get("/{client_id}", response_model=Client)
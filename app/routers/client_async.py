@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.crud.client import client_async as crud_client
+from app.schemas.client import Client, ClientCreate
+from app.utils.auth import get_current_admin_user_async, get_current_user_async
+from app.utils.pagination import set_next_cursor
+
+# Async-версия app/routers/client.py (подключается при ASYNC_DB_ENABLED)
+router = APIRouter(prefix="/clients", tags=["clients"])
+
+@router.post("/", response_model=Client, status_code=status.HTTP_201_CREATED)
+async def create_client(
+    client_in: ClientCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_admin_user_async)
+):
+    return await crud_client.create(db, obj_in=client_in.dict())
+
+@router.get("/", response_model=list[Client])
+async def read_clients(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)  # Все авторизованные могут читать
+):
+    """Получить список клиентов - доступно всем авторизованным пользователям"""
+    clients, next_cursor = await crud_client.get_page(db, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return clients
+
+@router.get("/{client_id}", response_model=Client)
+async def read_client(
+    client_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)  # Все авторизованные могут читать
+):
+    db_client = await crud_client.get(db, id=client_id)
+    if not db_client:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return db_client
+
+@router.put("/{client_id}", response_model=Client)
+async def update_client(
+    client_id: int,
+    client_in: ClientCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_admin_user_async)
+):
+    db_client = await crud_client.get(db, id=client_id)
+    if not db_client:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return await crud_client.update(db, db_obj=db_client, obj_in=client_in.dict())
+
+@router.delete("/{client_id}", response_model=Client)
+async def delete_client(
+    client_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_admin_user_async)
+):
+    db_client = await crud_client.get(db, id=client_id)
+    if not db_client:
+        raise HTTPException(status_code=404, detail="Client not found")
+
+    # Проверяем, есть ли связанные договоры (счётчиком — без загрузки связи)
+    contracts = await crud_client.count_contracts(db, client_id)
+    if contracts:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot delete client: client has {contracts} associated contract(s). Delete contracts first."
+        )
+
+    try:
+        return await crud_client.remove(db, id=client_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error deleting client: {str(e)}")
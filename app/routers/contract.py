@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.crud.contract import contract as crud_contract
 from app.schemas.contract import Contract, ContractCreate
 from app.utils.auth import get_current_admin_user, get_current_user
+from app.utils.pagination import set_next_cursor
 
 router = APIRouter(prefix="/contracts", tags=["contracts"])
 
@@ -17,13 +18,16 @@ def create_contract(
 
 @router.get("/", response_model=list[Contract])
 def read_contracts(
-    skip: int = 0,
+    response: Response,
+    cursor: str | None = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)  # Все авторизованные могут читать
 ):
     """Получить список договоров - доступно всем авторизованным пользователям"""
-    return crud_contract.get_multi(db, skip=skip, limit=limit)
+    contracts, next_cursor = crud_contract.get_page(db, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return contracts
 
 @router.get("/{contract_id}", response_model=Contract)
 def read_contract(
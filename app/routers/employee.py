@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.employee import Employee as EmployeeModel # <-- модель SQLAlchemy
 from app.schemas.employee import EmployeeCreate, Employee  # <-- Pydantic-схемы
 from app.utils.auth import get_password_hash, get_current_admin_user
+from app.utils.pagination import paginate, set_next_cursor
 
 router = APIRouter(prefix="/employees", tags=["employees"])
 
@@ -30,10 +31,12 @@ def create_employee(
 
 @router.get("/", response_model=list[Employee])
 def read_employees(
-    skip: int = 0,
+    response: Response,
+    cursor: str | None = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin_user)
 ):
-    employees = db.query(EmployeeModel).offset(skip).limit(limit).all()
+    employees, next_cursor = paginate(db.query(EmployeeModel), [EmployeeModel.id], cursor, limit)
+    set_next_cursor(response, next_cursor)
     return employees
\ No newline at end of file
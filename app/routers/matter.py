@@ -1,12 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
+from googleapiclient.discovery import build
+from datetime import datetime, timedelta
 from app.database import get_db
 from app.crud.matter import matter as crud_matter
+from app.models.employee import Employee
 from app.schemas.matter import Matter, MatterCreate
+from app.utils.google import get_google_credentials
 from app.utils.auth import get_current_admin_user, get_current_user
+from app.utils.pagination import set_next_cursor
 
 router = APIRouter(prefix="/matters", tags=["matters"])
 
+def create_matter_calendar_event(db: Session, user_id: int, new_matter):
+    """Событие о новом деле в Google Calendar пользователя, если календарь подключён"""
+    credentials = get_google_credentials(db, user_id)
+    if not credentials:
+        return
+    try:
+        service = build("calendar", "v3", credentials=credentials)
+
+        event = {
+            "summary": f"Дело: {new_matter.code} {new_matter.name}",
+            "description": (
+                f"Код дела: {new_matter.code}\n"
+                f"Описание: {new_matter.description or 'Нет описания'}\n"
+                f"Ссылка в LegalTime: http://127.0.0.1:8000/matters/{new_matter.id}"
+            ),
+            "start": {
+                "dateTime": datetime.utcnow().isoformat() + "Z",
+                "timeZone": "UTC",
+            },
+            "end": {
+                "dateTime": (datetime.utcnow() + timedelta(hours=1)).isoformat() + "Z",
+                "timeZone": "UTC",
+            },
+            "reminders": {
+                "useDefault": False,
+                "overrides": [
+                    {"method": "popup", "minutes": 30},
+                ],
+            },
+        }
+
+        service.events().insert(calendarId="primary", body=event).execute()
+        print("Подключён календарь:", credentials is not None)
+        # Можно добавить лог или уведомление, что событие создано
+    except Exception as e:
+        # Не падаем, если календарь не работает — это дополнительная фича
+        print(f"Не удалось создать событие в Google Calendar: {e}")
+
 @router.post("/", response_model=Matter, status_code=status.HTTP_201_CREATED)
 def create_matter(
     matter_in: MatterCreate,
@@ -17,52 +60,22 @@ def create_matter(
     new_matter = crud_matter.create(db, obj_in=matter_in.dict())
 
     # Попытка создать событие в Google Calendar, если пользователь подключил календарь
-    credentials = get_google_credentials(db, current_user.id)
-    if credentials:
-        try:
-            service = build("calendar", "v3", credentials=credentials)
-
-            event = {
-                "summary": f"Дело: {new_matter.code} {new_matter.name}",
-                "description": (
-                    f"Код дела: {new_matter.code}\n"
-                    f"Описание: {new_matter.description or 'Нет описания'}\n"
-                    f"Ссылка в LegalTime: http://127.0.0.1:8000/matters/{new_matter.id}"
-                ),
-                "start": {
-                    "dateTime": datetime.utcnow().isoformat() + "Z",
-                    "timeZone": "UTC",
-                },
-                "end": {
-                    "dateTime": (datetime.utcnow() + timedelta(hours=1)).isoformat() + "Z",
-                    "timeZone": "UTC",
-                },
-                "reminders": {
-                    "useDefault": False,
-                    "overrides": [
-                        {"method": "popup", "minutes": 30},
-                    ],
-                },
-            }
-
-            service.events().insert(calendarId="primary", body=event).execute()
-            print("Подключён календарь:", credentials is not None)
-            # Можно добавить лог или уведомление, что событие создано
-        except Exception as e:
-            # Не падаем, если календарь не работает — это дополнительная фича
-            print(f"Не удалось создать событие в Google Calendar: {e}")
+    create_matter_calendar_event(db, current_user.id, new_matter)
 
     return new_matter
 
 @router.get("/", response_model=list[Matter])
 def read_matters(
-    skip: int = 0,
+    response: Response,
+    cursor: str | None = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)  # Все авторизованные могут читать
 ):
     """Получить список дел - доступно всем авторизованным пользователям"""
-    return crud_matter.get_multi(db, skip=skip, limit=limit)
+    matters, next_cursor = crud_matter.get_page(db, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return matters
 
 @router.get("/{matter_id}", response_model=Matter)
 def read_matter(
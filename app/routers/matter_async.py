@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db, SessionLocal
+from app.crud.matter import matter_async as crud_matter
+from app.models.employee import Employee
+from app.routers.matter import create_matter_calendar_event
+from app.schemas.matter import Matter, MatterCreate
+from app.utils.auth import get_current_user_async
+from app.utils.pagination import set_next_cursor
+
+# Async-версия app/routers/matter.py (подключается при ASYNC_DB_ENABLED)
+router = APIRouter(prefix="/matters", tags=["matters"])
+
+
+def create_matter_calendar_event_sync(user_id: int, new_matter):
+    # Клиент Google синхронный — выполняется в пуле потоков со своей сессией
+    db = SessionLocal()
+    try:
+        create_matter_calendar_event(db, user_id, new_matter)
+    finally:
+        db.close()
+
+@router.post("/", response_model=Matter, status_code=status.HTTP_201_CREATED)
+async def create_matter(
+    matter_in: MatterCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    new_matter = await crud_matter.create(db, obj_in=matter_in.dict())
+    await run_in_threadpool(create_matter_calendar_event_sync, current_user.id, new_matter)
+    return new_matter
+
+@router.get("/", response_model=list[Matter])
+async def read_matters(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)  # Все авторизованные могут читать
+):
+    """Получить список дел - доступно всем авторизованным пользователям"""
+    matters, next_cursor = await crud_matter.get_page(db, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return matters
+
+@router.get("/{matter_id}", response_model=Matter)
+async def read_matter(
+    matter_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)  # Все авторизованные могут читать
+):
+    """Получить дело по ID - доступно всем авторизованным пользователям"""
+    db_matter = await crud_matter.get(db, id=matter_id)
+    if not db_matter:
+        raise HTTPException(status_code=404, detail="Matter not found")
+    return db_matter
+
+@router.put("/{matter_id}", response_model=Matter)
+async def update_matter(
+    matter_id: int,
+    matter_in: MatterCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    db_matter = await crud_matter.get(db, id=matter_id)
+    if not db_matter:
+        raise HTTPException(status_code=404, detail="Matter not found")
+    return await crud_matter.update(db, db_obj=db_matter, obj_in=matter_in.dict())
+
+@router.delete("/{matter_id}", response_model=Matter)
+async def delete_matter(
+    matter_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    db_matter = await crud_matter.get(db, id=matter_id)
+    if not db_matter:
+        raise HTTPException(status_code=404, detail="Matter not found")
+    return await crud_matter.remove(db, id=matter_id)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.employee import Employee
+from app.schemas.report import HoursReport, ReportDimension, ReportPeriod
+from app.schemas.time_entry import TimeEntryFilter
+from app.utils.auth import get_current_user
+from app.utils.reports import hours_report
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+@router.get("/hours", response_model=HoursReport, response_model_exclude_none=True)
+def read_hours_report(
+    filters: TimeEntryFilter = Depends(),
+    group_by: list[ReportDimension] = Query(default=["employee", "matter", "period", "status", "activity_type"]),
+    period: ReportPeriod = "month",
+    db: Session = Depends(get_db),
+    current_user: Employee = Depends(get_current_user)
+):
+    """Свёртка часов по сотрудникам, делам, периодам, статусам и видам работ"""
+    # Юрист видит только своё время, админ и старший — всех
+    if current_user.role not in ["admin", "senior_lawyer"]:
+        filters.employee_id = current_user.id
+    return hours_report(db, filters, group_by, period)
@@ -1,21 +1,92 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Literal
+from app.database import get_db, SessionLocal
 from app.crud.time_entry import time_entry as crud_time_entry
-from app.schemas.time_entry import TimeEntry, TimeEntryCreate
-from app.utils.auth import get_current_user
+from app.schemas.time_entry import (
+    TimeEntry,
+    TimeEntryCreate,
+    TimeEntryListFilter,
+    TimeEntryBatchCreate,
+    TimeEntryBatchUpdate,
+    TimeEntryBatchDelete,
+    TimeEntryBatchItemResult,
+    TimeEntryBatchResult,
+    TimeEntryFilter,
+    TimeEntryApprove,
+    TimeEntryApproveResult,
+)
+from app.utils.auth import get_current_user, get_current_admin_user
+from app.utils.pagination import set_next_cursor
 from app.models.employee import Employee
 from app.models.time_entry import TimeEntry as TimeEntryModel
 from app.models.matter import Matter
 from app.models.activity_type import ActivityType
-from app.utils.google_calendar import (
-    create_calendar_event,
-    update_calendar_event,
-    delete_calendar_event
-)
+from app.models.rate import Rate
+from app.utils.calendar_sync import sync_unsynced_entries
+from app.utils.rates import apply_rates
+from app.utils.time_entry_export import iter_export_records, iter_csv, iter_ndjson
+from app.crud.calendar_outbox import calendar_outbox as crud_calendar_outbox
+from app.tasks.calendar import dispatch_calendar_outbox, reconcile_employee_calendar
+from app.utils.google_calendar import build_event_body
+from app.config import settings
+from datetime import date, datetime, timedelta
 
 router = APIRouter(prefix="/time-entries", tags=["time-entries"])
 
+
+def enqueue_calendar_sync(employee_id: int):
+    """Запустить разбор calendar_outbox сотрудника, не дожидаясь планировщика"""
+    try:
+        dispatch_calendar_outbox.delay(employee_id)
+    except Exception as e:
+        # Изменение уже лежит в outbox — его подберёт периодический диспетчер
+        print(f"Failed to enqueue calendar sync: {e}")
+
+
+def enqueue_calendar_sync_many(db: Session, employee_ids: set[int]):
+    """Один запуск диспетчера на каждого затронутого сотрудника с подключённым календарём"""
+    if not employee_ids:
+        return
+    connected = (
+        db.query(Employee.id)
+        .filter(Employee.id.in_(employee_ids), Employee.google_token_encrypted.isnot(None))
+        .all()
+    )
+    for (employee_id,) in connected:
+        enqueue_calendar_sync(employee_id)
+
+
+def check_references(db: Session, items: list) -> dict[int, str]:
+    """Проверить дела/виды работ/ставки пакета тремя запросами: {index: ошибка}"""
+    references = [
+        ("matter_id", Matter, "Matter not found"),
+        ("activity_type_id", ActivityType, "Activity type not found"),
+        ("rate_id", Rate, "Rate not found"),
+    ]
+    errors = {}
+    for field, model, message in references:
+        wanted = {getattr(item, field) for item in items if getattr(item, field, None) is not None}
+        if not wanted:
+            continue
+        existing = {row[0] for row in db.query(model.id).filter(model.id.in_(wanted)).all()}
+        for index, item in enumerate(items):
+            value = getattr(item, field, None)
+            if value is not None and value not in existing:
+                errors.setdefault(index, message)
+    return errors
+
+
+def ok_result(index: int, entry: TimeEntryModel) -> TimeEntryBatchItemResult:
+    return TimeEntryBatchItemResult(index=index, ok=True, id=entry.id, entry=TimeEntry.model_validate(entry))
+
+
+def batch_result(results: list[TimeEntryBatchItemResult]) -> TimeEntryBatchResult:
+    succeeded = sum(1 for result in results if result.ok)
+    return TimeEntryBatchResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
 # Юрист создаёт только свои таймшиты
 @router.post("/", response_model=TimeEntry, status_code=status.HTTP_201_CREATED)
 def create_time_entry(
@@ -28,49 +99,204 @@ def create_time_entry(
     obj_in["employee_id"] = current_user.id
     entry = crud_time_entry.create(db, obj_in=obj_in)
     
-    # Синхронизация с Google Calendar
+    # Синхронизация с Google Calendar — в фоне, ответ не ждёт Google
     if current_user.google_token_encrypted:
-        try:
-            matter = db.query(Matter).filter(Matter.id == entry.matter_id).first()
-            activity_type = db.query(ActivityType).filter(ActivityType.id == entry.activity_type_id).first()
-            if matter and activity_type:
-                event_id = create_calendar_event(current_user, entry, matter, activity_type)
-                if event_id:
-                    entry.google_event_id = event_id
-                    db.commit()
-                    db.refresh(entry)
-        except Exception as e:
-            # Не прерываем создание таймшита, если синхронизация не удалась
-            print(f"Failed to sync with Google Calendar: {e}")
+        enqueue_calendar_sync(current_user.id)
     
-    return entry
+    return apply_rates(db, [entry])[0]
 
 # Юрист видит только свои таймшиты
 @router.get("/", response_model=list[TimeEntry])
 def read_my_time_entries(
-    skip: int = 0,
+    response: Response,
+    filters: TimeEntryListFilter = Depends(),
+    cursor: str | None = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: Employee = Depends(get_current_user)
 ):
-    entries = (
-        db.query(TimeEntryModel)
-        .filter(TimeEntryModel.employee_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-    return entries
+    filters.employee_id = current_user.id  # чужие записи через этот маршрут не отдаём
+    entries, next_cursor = crud_time_entry.get_filtered_page(db, filters, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return apply_rates(db, entries)
 
-# Админ/старший видит все (или по фильтру — потом доработаем)
+# Админ/старший видит все, с фильтрами по сотруднику, делу, договору, клиенту и т.д.
 @router.get("/all", response_model=list[TimeEntry])
 def read_all_time_entries(
-    skip: int = 0,
+    response: Response,
+    filters: TimeEntryListFilter = Depends(),
+    cursor: str | None = None,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: Employee = Depends(get_current_user)  # пока только админ
 ):
-    return crud_time_entry.get_multi(db, skip=skip, limit=limit)
+    entries, next_cursor = crud_time_entry.get_filtered_page(db, filters, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return apply_rates(db, entries)
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", iter_csv),
+    "ndjson": ("application/x-ndjson", iter_ndjson),
+}
+
+@router.get("/export")
+def export_time_entries(
+    filters: TimeEntryFilter = Depends(),
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    current_user: Employee = Depends(get_current_user)
+):
+    """Потоковая выгрузка таймшитов (CSV или NDJSON) с теми же фильтрами, что и у списков"""
+    if current_user.role not in ["admin", "senior_lawyer"]:
+        filters.employee_id = current_user.id
+    media_type, render = EXPORT_FORMATS[export_format]
+
+    def stream():
+        # Сессия из get_db закрывается до начала отправки тела — открываем свою
+        db = SessionLocal()
+        try:
+            yield from render(iter_export_records(db, filters))
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="time_entries.{export_format}"'},
+    )
+
+@router.get("/calendar/outbox", response_model=dict)
+def read_calendar_outbox_stats(
+    db: Session = Depends(get_db),
+    current_user: Employee = Depends(get_current_admin_user)
+):
+    """Состояние очереди синхронизации с Google Calendar"""
+    return crud_calendar_outbox.stats(db)
+
+@router.post("/batch", response_model=TimeEntryBatchResult)
+def create_time_entries_batch(
+    batch_in: TimeEntryBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: Employee = Depends(get_current_user)
+):
+    """Создать несколько таймшитов (например, неделю) одним INSERT"""
+    errors = check_references(db, batch_in.items)
+    rows, indexes = [], []
+    for index, item in enumerate(batch_in.items):
+        if index not in errors:
+            rows.append({**item.dict(), "employee_id": current_user.id})
+            indexes.append(index)
+
+    created = apply_rates(db, crud_time_entry.create_many(db, rows))
+
+    results = [TimeEntryBatchItemResult(index=index, ok=False, error=error) for index, error in errors.items()]
+    results += [
+        ok_result(index, entry)
+        for index, entry in zip(indexes, created)
+    ]
+    results.sort(key=lambda result: result.index)
+
+    if created and current_user.google_token_encrypted:
+        enqueue_calendar_sync(current_user.id)
+    return batch_result(results)
+
+@router.patch("/batch", response_model=TimeEntryBatchResult)
+def update_time_entries_batch(
+    batch_in: TimeEntryBatchUpdate,
+    db: Session = Depends(get_db),
+    current_user: Employee = Depends(get_current_user)
+):
+    """Изменить несколько таймшитов; в элементе передаются только меняемые поля"""
+    items = batch_in.items
+    entries = crud_time_entry.get_many(db, [item.id for item in items], for_update=True)
+    errors = check_references(db, items)
+    seen, changes, indexes = set(), [], []
+    for index, item in enumerate(items):
+        entry = entries.get(item.id)
+        obj_in = item.dict(exclude_unset=True, exclude={"id"})
+        if index in errors:
+            continue
+        if item.id in seen:
+            errors[index] = "Duplicate id in batch"
+        elif entry is None:
+            errors[index] = "Time entry not found"
+        elif entry.employee_id != current_user.id and current_user.role != "admin":
+            errors[index] = "Not authorized"
+        elif any(obj_in.get(field, 0) is None for field in ("hours", "date", "matter_id", "activity_type_id")):
+            errors[index] = "Required field cannot be null"
+        else:
+            changes.append((entry, obj_in))
+            indexes.append(index)
+        seen.add(item.id)
+
+    updated = apply_rates(db, crud_time_entry.update_many(db, changes))
+
+    results = [TimeEntryBatchItemResult(index=index, ok=False, id=items[index].id, error=error)
+               for index, error in errors.items()]
+    results += [
+        ok_result(index, entry)
+        for index, entry in zip(indexes, updated)
+    ]
+    results.sort(key=lambda result: result.index)
+
+    enqueue_calendar_sync_many(db, {entry.employee_id for entry in updated})
+    return batch_result(results)
+
+@router.delete("/batch", response_model=TimeEntryBatchResult)
+def delete_time_entries_batch(
+    batch_in: TimeEntryBatchDelete,
+    db: Session = Depends(get_db),
+    current_user: Employee = Depends(get_current_user)
+):
+    """Удалить несколько таймшитов одним DELETE"""
+    entries = crud_time_entry.get_many(db, batch_in.ids, for_update=True)
+    results, to_remove, indexes = {}, [], []
+    seen = set()
+    for index, entry_id in enumerate(batch_in.ids):
+        entry = entries.get(entry_id)
+        if entry_id in seen:
+            error = "Duplicate id in batch"
+        elif entry is None:
+            error = "Time entry not found"
+        elif entry.employee_id != current_user.id and current_user.role != "admin":
+            error = "Not authorized"
+        else:
+            error = None
+            to_remove.append(entry)
+            indexes.append(index)
+        if error:
+            results[index] = TimeEntryBatchItemResult(index=index, ok=False, id=entry_id, error=error)
+        seen.add(entry_id)
+
+    removed = apply_rates(db, crud_time_entry.remove_many(db, to_remove))
+    for index, entry in zip(indexes, removed):
+        results[index] = ok_result(index, entry)
+
+    # Событие в календаре есть только у уже выгруженных записей
+    enqueue_calendar_sync_many(db, {entry.employee_id for entry in removed if entry.google_event_id})
+    return batch_result([results[index] for index in sorted(results)])
+
+@router.patch("/approve", response_model=TimeEntryApproveResult)
+def approve_time_entries(
+    approve_in: TimeEntryApprove,
+    db: Session = Depends(get_db),
+    current_user: Employee = Depends(get_current_user)
+):
+    """Одобрить черновики по списку id и/или фильтру (сотрудник, дело, период)"""
+    # Те же права, что и у одобрения одной записи
+    if current_user.role not in ["admin", "senior_lawyer"]:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    filters = TimeEntryFilter(
+        employee_id=approve_in.employee_id,
+        matter_id=approve_in.matter_id,
+        date_from=approve_in.date_from,
+        date_to=approve_in.date_to,
+    )
+    rows = crud_time_entry.approve_many(db, filters, ids=approve_in.ids)
+
+    # Календари обновит диспетчер outbox, по запуску на сотрудника
+    enqueue_calendar_sync_many(db, {row.employee_id for row in rows})
+    return TimeEntryApproveResult(approved=len(rows), ids=[row.id for row in rows])
 
 @router.get("/{entry_id}", response_model=TimeEntry)
 def read_time_entry(
@@ -83,7 +309,7 @@ def read_time_entry(
         raise HTTPException(status_code=404, detail="Time entry not found")
     if entry.employee_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    return entry
+    return apply_rates(db, [entry])[0]
 
 # Удаление и редактирование — только свои или админ
 @router.put("/{entry_id}", response_model=TimeEntry)
@@ -102,27 +328,12 @@ def update_time_entry(
     obj_in["employee_id"] = entry.employee_id  # нельзя менять владельца
     updated_entry = crud_time_entry.update(db, db_obj=entry, obj_in=obj_in)
     
-    # Синхронизация с Google Calendar
+    # Синхронизация с Google Calendar (создаст событие, если его ещё не было)
     employee = db.query(Employee).filter(Employee.id == updated_entry.employee_id).first()
     if employee and employee.google_token_encrypted:
-        try:
-            matter = db.query(Matter).filter(Matter.id == updated_entry.matter_id).first()
-            activity_type = db.query(ActivityType).filter(ActivityType.id == updated_entry.activity_type_id).first()
-            if matter and activity_type:
-                if updated_entry.google_event_id:
-                    # Обновляем существующее событие
-                    event_id = update_calendar_event(employee, updated_entry, matter, activity_type, updated_entry.google_event_id)
-                else:
-                    # Создаем новое событие, если его не было
-                    event_id = create_calendar_event(employee, updated_entry, matter, activity_type)
-                    if event_id:
-                        updated_entry.google_event_id = event_id
-                        db.commit()
-                        db.refresh(updated_entry)
-        except Exception as e:
-            print(f"Failed to sync with Google Calendar: {e}")
+        enqueue_calendar_sync(employee.id)
     
-    return updated_entry
+    return apply_rates(db, [updated_entry])[0]
 
 @router.delete("/{entry_id}", response_model=TimeEntry)
 def delete_time_entry(
@@ -136,15 +347,14 @@ def delete_time_entry(
     if entry.employee_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Удаляем событие из Google Calendar перед удалением таймшита
-    employee = db.query(Employee).filter(Employee.id == entry.employee_id).first()
-    if employee and employee.google_token_encrypted and entry.google_event_id:
-        try:
-            delete_calendar_event(employee, entry.google_event_id)
-        except Exception as e:
-            print(f"Failed to delete calendar event: {e}")
+    removed = crud_time_entry.remove(db, id=entry_id)
+    
+    # Событие в Google Calendar удалит диспетчер outbox
+    employee = db.query(Employee).filter(Employee.id == removed.employee_id).first()
+    if employee and employee.google_token_encrypted and removed.google_event_id:
+        enqueue_calendar_sync(employee.id)
     
-    return crud_time_entry.remove(db, id=entry_id)
+    return apply_rates(db, [removed])[0]
 
 @router.patch("/{entry_id}/approve", response_model=TimeEntry)
 def approve_time_entry(
@@ -160,22 +370,14 @@ def approve_time_entry(
     if current_user.role not in ["admin", "senior_lawyer"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    entry.status = "approved"
-    db.commit()
-    db.refresh(entry)
+    entry = crud_time_entry.approve(db, db_obj=entry)
     
     # Обновляем событие в календаре при одобрении
     employee = db.query(Employee).filter(Employee.id == entry.employee_id).first()
-    if employee and employee.google_token_encrypted and entry.google_event_id:
-        try:
-            matter = db.query(Matter).filter(Matter.id == entry.matter_id).first()
-            activity_type = db.query(ActivityType).filter(ActivityType.id == entry.activity_type_id).first()
-            if matter and activity_type:
-                update_calendar_event(employee, entry, matter, activity_type, entry.google_event_id)
-        except Exception as e:
-            print(f"Failed to sync approval with Google Calendar: {e}")
+    if employee and employee.google_token_encrypted:
+        enqueue_calendar_sync(employee.id)
     
-    return entry
+    return apply_rates(db, [entry])[0]
 
 
 @router.post("/sync-to-calendar", response_model=dict)
@@ -190,45 +392,7 @@ def sync_all_entries_to_calendar(
             detail="Google Calendar not connected. Please connect your Google account first."
         )
     
-    # Получаем все таймшиты пользователя без google_event_id
-    entries = (
-        db.query(TimeEntryModel)
-        .filter(
-            TimeEntryModel.employee_id == current_user.id,
-            TimeEntryModel.google_event_id.is_(None)
-        )
-        .all()
-    )
-    
-    synced_count = 0
-    failed_count = 0
-    
-    for entry in entries:
-        try:
-            matter = db.query(Matter).filter(Matter.id == entry.matter_id).first()
-            activity_type = db.query(ActivityType).filter(ActivityType.id == entry.activity_type_id).first()
-            
-            if matter and activity_type:
-                event_id = create_calendar_event(current_user, entry, matter, activity_type)
-                if event_id:
-                    entry.google_event_id = event_id
-                    synced_count += 1
-                else:
-                    failed_count += 1
-            else:
-                failed_count += 1
-        except Exception as e:
-            print(f"Failed to sync entry {entry.id}: {e}")
-            failed_count += 1
-    
-    db.commit()
-    
-    return {
-        "message": f"Sync completed",
-        "synced": synced_count,
-        "failed": failed_count,
-        "total": len(entries)
-    }
+    return {"message": "Sync completed", **sync_unsynced_entries(db, current_user)}
 
 
 @router.get("/calendar/events")
@@ -237,67 +401,47 @@ def get_calendar_events(
     current_user: Employee = Depends(get_current_user),
     max_results: int = 50
 ):
-    """Получить события из Google Calendar, связанные с таймшитами"""
-    from app.utils.google_calendar import get_calendar_service
-    from datetime import datetime, timedelta
-    from googleapiclient.errors import HttpError
-    
+    """Получить события календаря, связанные с таймшитами (из сверенного локального состояния)"""
     if not current_user.google_token_encrypted:
         raise HTTPException(
             status_code=400,
             detail="Google Calendar not connected. Please connect your Google account first."
         )
     
-    service = get_calendar_service(current_user)
-    if not service:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to connect to Google Calendar service"
-        )
+    # Изменения из Google подтягиваются в фоне; здесь только «пинаем» сверку, если она устарела
+    synced_at = current_user.google_synced_at
+    stale_after = timedelta(seconds=settings.CALENDAR_RECONCILE_INTERVAL_SECONDS)
+    if synced_at is None or datetime.utcnow() - synced_at > stale_after:
+        try:
+            reconcile_employee_calendar.delay(current_user.id)
+        except Exception as e:
+            print(f"Failed to enqueue calendar reconciliation: {e}")
     
-    calendar_id = current_user.google_calendar_id or 'primary'
+    # События за последние 30 дней и следующие 30 дней
+    today = date.today()
+    rows = crud_time_entry.get_synced_with_refs(
+        db,
+        current_user.id,
+        date_from=today - timedelta(days=30),
+        date_to=today + timedelta(days=30),
+        limit=max_results,
+    )
     
-    # Получаем события за последние 30 дней и следующие 30 дней
-    time_min = (datetime.utcnow() - timedelta(days=30)).isoformat() + 'Z'
-    time_max = (datetime.utcnow() + timedelta(days=30)).isoformat() + 'Z'
+    time_entry_events = []
+    for entry, matter, activity_type in rows:
+        event = build_event_body(entry, matter, activity_type)
+        time_entry_events.append({
+            'event_id': entry.google_event_id,
+            'summary': event['summary'],
+            'description': event['description'],
+            'start': event['start'],
+            'end': event['end'],
+            'time_entry_id': entry.id,
+            'status': entry.status
+        })
     
-    try:
-        events_result = service.events().list(
-            calendarId=calendar_id,
-            timeMin=time_min,
-            timeMax=time_max,
-            maxResults=max_results,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        
-        # Фильтруем только события, связанные с таймшитами
-        time_entry_events = []
-        for event in events:
-            # Проверяем, есть ли это событие в нашей БД
-            entry = db.query(TimeEntryModel).filter(
-                TimeEntryModel.google_event_id == event.get('id')
-            ).first()
-            
-            if entry:
-                time_entry_events.append({
-                    'event_id': event.get('id'),
-                    'summary': event.get('summary'),
-                    'description': event.get('description'),
-                    'start': event.get('start'),
-                    'end': event.get('end'),
-                    'time_entry_id': entry.id,
-                    'status': entry.status
-                })
-        
-        return {
-            'events': time_entry_events,
-            'total': len(time_entry_events)
-        }
-    except HttpError as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to fetch calendar events: {str(e)}"
-        )
+    return {
+        'events': time_entry_events,
+        'total': len(time_entry_events),
+        'synced_at': synced_at
+    }
@@ -0,0 +1,135 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.crud.time_entry import time_entry_async as crud_time_entry
+from app.schemas.time_entry import TimeEntry, TimeEntryCreate, TimeEntryListFilter
+from app.utils.auth import get_current_user_async
+from app.utils.pagination import set_next_cursor
+from app.models.employee import Employee
+from app.utils.rates import apply_rates, get_rate_index_async
+from app.routers.time_entry import enqueue_calendar_sync
+
+# Async-версия основных маршрутов app/routers/time_entry.py (подключается
+# при ASYNC_DB_ENABLED перед синхронным роутером). Пакетные операции,
+# выгрузка и календарь остаются синхронными. Путь {entry_id:int}, чтобы
+# не перехватывать /export, /batch и прочие маршруты синхронного роутера.
+router = APIRouter(prefix="/time-entries", tags=["time-entries"])
+
+
+async def with_rates(db: AsyncSession, entries: list) -> list:
+    # Индекс ставок загружается async-запросом, run_sync только раскладывает ставки
+    index = await get_rate_index_async(db)
+    return await db.run_sync(apply_rates, entries, index)
+
+
+async def enqueue_calendar_sync_async(db: AsyncSession, employee_id: int, need_event: bool = True):
+    """Запуск диспетчера outbox, если у сотрудника подключён календарь (Celery — в пуле потоков)"""
+    employee = await db.get(Employee, employee_id)
+    if employee and employee.google_token_encrypted and need_event:
+        await run_in_threadpool(enqueue_calendar_sync, employee_id)
+
+# Юрист создаёт только свои таймшиты
+@router.post("/", response_model=TimeEntry, status_code=status.HTTP_201_CREATED)
+async def create_time_entry(
+    time_entry_in: TimeEntryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    obj_in = time_entry_in.dict()
+    obj_in["employee_id"] = current_user.id
+    entry = await crud_time_entry.create(db, obj_in=obj_in)
+    if current_user.google_token_encrypted:
+        await run_in_threadpool(enqueue_calendar_sync, current_user.id)
+    return (await with_rates(db, [entry]))[0]
+
+# Юрист видит только свои таймшиты
+@router.get("/", response_model=list[TimeEntry])
+async def read_my_time_entries(
+    response: Response,
+    filters: TimeEntryListFilter = Depends(),
+    cursor: str | None = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    filters.employee_id = current_user.id  # чужие записи через этот маршрут не отдаём
+    entries, next_cursor = await crud_time_entry.get_filtered_page(db, filters, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return await with_rates(db, entries)
+
+@router.get("/all", response_model=list[TimeEntry])
+async def read_all_time_entries(
+    response: Response,
+    filters: TimeEntryListFilter = Depends(),
+    cursor: str | None = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)  # пока только админ
+):
+    entries, next_cursor = await crud_time_entry.get_filtered_page(db, filters, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return await with_rates(db, entries)
+
+@router.get("/{entry_id:int}", response_model=TimeEntry)
+async def read_time_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    entry = await crud_time_entry.get(db, id=entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Time entry not found")
+    if entry.employee_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return (await with_rates(db, [entry]))[0]
+
+# Удаление и редактирование — только свои или админ
+@router.put("/{entry_id:int}", response_model=TimeEntry)
+async def update_time_entry(
+    entry_id: int,
+    time_entry_in: TimeEntryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    entry = await crud_time_entry.get(db, id=entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Time entry not found")
+    if entry.employee_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    obj_in = time_entry_in.dict()
+    obj_in["employee_id"] = entry.employee_id  # нельзя менять владельца
+    updated_entry = await crud_time_entry.update(db, db_obj=entry, obj_in=obj_in)
+    await enqueue_calendar_sync_async(db, updated_entry.employee_id)
+    return (await with_rates(db, [updated_entry]))[0]
+
+@router.delete("/{entry_id:int}", response_model=TimeEntry)
+async def delete_time_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    entry = await crud_time_entry.get(db, id=entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Time entry not found")
+    if entry.employee_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    removed = await crud_time_entry.remove(db, id=entry_id)
+    # Событие в Google Calendar удалит диспетчер outbox
+    await enqueue_calendar_sync_async(db, removed.employee_id, need_event=bool(removed.google_event_id))
+    return (await with_rates(db, [removed]))[0]
+
+@router.patch("/{entry_id:int}/approve", response_model=TimeEntry)
+async def approve_time_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    entry = await crud_time_entry.get(db, id=entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Time entry not found")
+    if current_user.role not in ["admin", "senior_lawyer"]:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    entry = await crud_time_entry.approve(db, db_obj=entry)
+    await enqueue_calendar_sync_async(db, entry.employee_id)
+    return (await with_rates(db, [entry]))[0]
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+class BillingSubtotal(BaseModel):
+    """Подытог предпросмотра счёта по делу, договору или сотруднику"""
+    id: int
+    code: Optional[str] = None    # код дела / номер договора
+    name: Optional[str] = None    # название дела / имя сотрудника
+    entries: int
+    hours: float                  # фактические часы
+    billable_hours: float         # после округления до шага
+    amount: float
+    unpriced_entries: int = 0     # записи без действующей ставки (в сумму не входят)
+
+class BillingPreview(BaseModel):
+    client_id: int
+    client_name: str
+    date_from: date
+    date_to: date
+    include_drafts: bool
+    hours_increment: float
+    entries: int
+    hours: float
+    billable_hours: float
+    amount: float
+    unpriced_entries: int
+    matters: list[BillingSubtotal]
+    contracts: list[BillingSubtotal]
+    employees: list[BillingSubtotal]
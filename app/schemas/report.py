@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from typing import Literal, Optional
+from datetime import date
+
+# Разрезы отчёта по часам
+ReportDimension = Literal["employee", "matter", "contract", "client", "period", "status", "activity_type"]
+ReportPeriod = Literal["day", "week", "month"]
+
+class HoursRollupRow(BaseModel):
+    """Строка свёртки: заполнены только поля выбранных разрезов"""
+    employee_id: Optional[int] = None
+    employee_name: Optional[str] = None
+    matter_id: Optional[int] = None
+    matter_code: Optional[str] = None
+    matter_name: Optional[str] = None
+    contract_id: Optional[int] = None
+    contract_number: Optional[str] = None
+    client_id: Optional[int] = None
+    client_name: Optional[str] = None
+    period: Optional[date] = None  # начало дня/недели (понедельник)/месяца
+    status: Optional[str] = None
+    activity_type_id: Optional[int] = None
+    activity_type_name: Optional[str] = None
+    hours: float
+    entries: int
+
+class HoursTotals(BaseModel):
+    hours: float = 0
+    entries: int = 0
+    draft_hours: float = 0
+    draft_entries: int = 0
+    approved_hours: float = 0
+    approved_entries: int = 0
+
+class HoursReport(BaseModel):
+    group_by: list[ReportDimension]
+    period: ReportPeriod
+    rows: list[HoursRollupRow]
+    totals: HoursTotals
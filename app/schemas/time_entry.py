@@ -1,6 +1,8 @@
+from pydantic import BaseModel, Field, model_validator
 from .base import BaseSchema
-from typing import Optional
+from typing import Literal, Optional
 from datetime import date
+import datetime
 
 class TimeEntryBase(BaseSchema):
     hours: float
@@ -17,6 +19,84 @@ class TimeEntry(TimeEntryBase):
     id: int
     employee_id: int
     status: str = "draft" # draft / approved
+    # Действующая ставка (см. app/utils/rates.py) и сумма = часы × ставка
+    effective_rate_id: Optional[int] = None
+    effective_rate: Optional[float] = None
+    amount: Optional[float] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Сортировка списков: поле, «-» в начале — по убыванию
+TimeEntrySort = Literal["date", "-date", "hours", "-hours", "id", "-id"]
+
+class TimeEntryFilter(BaseModel):
+    """Фильтры таймшитов (query-параметры списков и отчётов)"""
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    employee_id: Optional[int] = None
+    matter_id: Optional[int] = None
+    contract_id: Optional[int] = None
+    client_id: Optional[int] = None
+    activity_type_id: Optional[int] = None
+    status: Optional[Literal["draft", "approved"]] = None
+
+class TimeEntryListFilter(TimeEntryFilter):
+    """Фильтры и сортировка списка таймшитов"""
+    sort: TimeEntrySort = "-date"
+
+# Пакетные операции: не больше BATCH_MAX_ITEMS записей за запрос
+BATCH_MAX_ITEMS = 500
+
+class TimeEntryUpdateItem(BaseModel):
+    """Правка одной записи пакета: id и только изменяемые поля"""
+    id: int
+    hours: Optional[float] = None
+    description: Optional[str] = None
+    date: Optional[datetime.date] = None  # модульное имя: поле date перекрывает тип
+    matter_id: Optional[int] = None
+    activity_type_id: Optional[int] = None
+    rate_id: Optional[int] = None
+
+class TimeEntryBatchCreate(BaseModel):
+    items: list[TimeEntryCreate] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+class TimeEntryBatchUpdate(BaseModel):
+    items: list[TimeEntryUpdateItem] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+class TimeEntryBatchDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+class TimeEntryBatchItemResult(BaseModel):
+    """Результат по элементу пакета (index — позиция в запросе)"""
+    index: int
+    ok: bool
+    id: Optional[int] = None
+    entry: Optional[TimeEntry] = None
+    error: Optional[str] = None
+
+class TimeEntryBatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[TimeEntryBatchItemResult]
+
+class TimeEntryApprove(BaseModel):
+    """Массовое одобрение: список id и/или фильтр; одобряются только черновики"""
+    ids: Optional[list[int]] = Field(default=None, min_length=1, max_length=10_000)
+    employee_id: Optional[int] = None
+    matter_id: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    @model_validator(mode="after")
+    def check_criteria(self):
+        # Пустое тело одобрило бы все черновики фирмы — требуем явный критерий
+        if not self.ids and all(
+            value is None for value in (self.employee_id, self.matter_id, self.date_from, self.date_to)
+        ):
+            raise ValueError("Specify ids or at least one filter")
+        return self
+
+class TimeEntryApproveResult(BaseModel):
+    approved: int
+    ids: list[int]
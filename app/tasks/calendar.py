@@ -0,0 +1,50 @@
+from app.worker import celery_app
+from app.database import SessionLocal
+from app.models.employee import Employee
+from app.utils import calendar_dispatcher, calendar_reconcile
+
+# Фоновая синхронизация таймшитов с Google Calendar.
+# Роутеры пишут изменения в calendar_outbox в одной транзакции с таймшитом
+# и сразу отвечают клиенту, а диспетчер (по расписанию celery beat и по
+# «пинку» после коммита) разбирает очередь и сохраняет google_event_id.
+# Функции календаря вызываются через модуль google_calendar, поэтому
+# в тестах их легко подменить фейковой реализацией.
+
+
+@celery_app.task
+def dispatch_calendar_outbox(employee_id: int | None = None):
+    """Разобрать очередь calendar_outbox (по одному сотруднику или по всем)"""
+    db = SessionLocal()
+    try:
+        return calendar_dispatcher.dispatch_calendar_outbox(db, employee_id=employee_id)
+    finally:
+        db.close()
+
+
+@celery_app.task
+def reconcile_employee_calendar(employee_id: int):
+    """Подтянуть изменения из Google Calendar сотрудника в таймшиты"""
+    db = SessionLocal()
+    try:
+        employee = db.query(Employee).filter(Employee.id == employee_id).first()
+        if not employee or not employee.google_token_encrypted:
+            return None
+        return calendar_reconcile.reconcile_calendar(db, employee)
+    finally:
+        db.close()
+
+
+@celery_app.task
+def reconcile_calendars():
+    """Поставить сверку для всех сотрудников с подключённым календарём"""
+    db = SessionLocal()
+    try:
+        employee_ids = [
+            row[0] for row in
+            db.query(Employee.id).filter(Employee.google_token_encrypted.isnot(None)).all()
+        ]
+    finally:
+        db.close()
+    for employee_id in employee_ids:
+        reconcile_employee_calendar.delay(employee_id)
+    return len(employee_ids)
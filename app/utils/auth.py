@@ -2,9 +2,11 @@ from datetime import datetime, timedelta, UTC
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status, Cookie
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.employee import Employee
 from app.schemas.auth import TokenData
 from app.config import settings
@@ -45,11 +47,8 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-# Получение текущего пользователя из cookie
-def get_current_user(
-    access_token: str | None = Cookie(default=None, alias="access_token"),
-    db: Session = Depends(get_db)
-):
+# Email пользователя из JWT в cookie
+def get_token_email(access_token: str | None) -> str:
     if access_token is None:
         raise credentials_exception
 
@@ -59,19 +58,41 @@ def get_current_user(
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
-        role: str = payload.get("role")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    return email
 
+# Получение текущего пользователя из cookie
+def get_current_user(
+    access_token: str | None = Cookie(default=None, alias="access_token"),
+    db: Session = Depends(get_db)
+):
+    email = get_token_email(access_token)
     user = db.query(Employee).filter(Employee.email == email).first()
     if user is None:
         raise credentials_exception
     return user
 
+# То же для async-роутеров (AsyncSession)
+async def get_current_user_async(
+    access_token: str | None = Cookie(default=None, alias="access_token"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    email = get_token_email(access_token)
+    user = await db.scalar(select(Employee).where(Employee.email == email))
+    if user is None:
+        raise credentials_exception
+    return user
+
 # Только админ
 def get_current_admin_user(current_user: Employee = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_admin_user_async(current_user: Employee = Depends(get_current_user_async)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return current_user
@@ -0,0 +1,150 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from datetime import datetime
+from app.config import settings
+from app.crud.calendar_outbox import calendar_outbox as crud_outbox
+from app.models.calendar_outbox import OutboxOperation, OutboxStatus
+from app.models.employee import Employee
+from app.models.time_entry import TimeEntry
+from app.models.matter import Matter
+from app.models.activity_type import ActivityType
+from app.utils import google_calendar
+
+# Диспетчер calendar_outbox: забирает ожидающие записи пачками по сотрудникам,
+# схлопывает несколько изменений одного таймшита в один вызов API
+# и записывает результат (попытки, ошибку, время следующего повтора).
+
+# Пространство имён advisory-блокировок PostgreSQL для диспетчера
+OUTBOX_LOCK_NAMESPACE = 4201
+
+
+def _try_lock_employee(db: Session, employee_id: int) -> bool:
+    """Один сотрудник — один диспетчер, иначе два воркера могут создать дубли событий"""
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    return bool(db.execute(
+        text("SELECT pg_try_advisory_xact_lock(:ns, :employee_id)"),
+        {"ns": OUTBOX_LOCK_NAMESPACE, "employee_id": employee_id},
+    ).scalar())
+
+
+def _apply_upsert(db, service, employee, entry, matters, activity_types) -> bool:
+    matter = matters.get(entry.matter_id)
+    activity_type = activity_types.get(entry.activity_type_id)
+    if not matter or not activity_type:
+        return False
+
+    if entry.google_event_id:
+        return google_calendar.update_calendar_event(
+            employee, entry, matter, activity_type, entry.google_event_id, service=service
+        ) is not None
+
+    event_id = google_calendar.create_calendar_event(employee, entry, matter, activity_type, service=service)
+    if not event_id:
+        return False
+    updated = (
+        db.query(TimeEntry)
+        .filter(TimeEntry.id == entry.id, TimeEntry.google_event_id.is_(None))
+        .update({TimeEntry.google_event_id: event_id}, synchronize_session=False)
+    )
+    if not updated:
+        # Таймшит удалили, пока создавалось событие — не оставляем сироту в календаре
+        google_calendar.delete_calendar_event(employee, event_id, service=service)
+    return True
+
+
+def _dispatch_employee(db: Session, employee_id: int, now: datetime, batch_size: int) -> dict:
+    result = {"processed": 0, "failed": 0, "api_calls": 0}
+    if not _try_lock_employee(db, employee_id):
+        return result
+
+    rows = crud_outbox.lock_batch(db, employee_id, now, batch_size)
+    if not rows:
+        db.commit()
+        return result
+
+    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+    if not employee or not employee.google_token_encrypted:
+        crud_outbox.mark_done(rows, now, status=OutboxStatus.skipped)
+        db.commit()
+        result["processed"] = len(rows)
+        return result
+
+    service = google_calendar.get_calendar_service(employee)
+    if not service:
+        crud_outbox.mark_failed(rows, now, "Calendar service unavailable", settings.CALENDAR_OUTBOX_MAX_ATTEMPTS)
+        db.commit()
+        result["failed"] = len(rows)
+        return result
+
+    # Схлопываем изменения: по каждому таймшиту важна только последняя операция
+    groups: dict[int, list] = {}
+    for row in rows:
+        groups.setdefault(row.time_entry_id, []).append(row)
+
+    entries = {
+        entry.id: entry
+        for entry in db.query(TimeEntry).filter(TimeEntry.id.in_(list(groups))).all()
+    }
+    matters = {
+        matter.id: matter
+        for matter in db.query(Matter).filter(Matter.id.in_({e.matter_id for e in entries.values()})).all()
+    }
+    activity_types = {
+        activity_type.id: activity_type
+        for activity_type in db.query(ActivityType)
+        .filter(ActivityType.id.in_({e.activity_type_id for e in entries.values()}))
+        .all()
+    }
+
+    for time_entry_id, group in groups.items():
+        last = group[-1]
+        error = None
+        try:
+            if last.operation == OutboxOperation.delete:
+                if last.google_event_id:
+                    result["api_calls"] += 1
+                    ok = google_calendar.delete_calendar_event(employee, last.google_event_id, service=service)
+                else:
+                    ok = True  # событие так и не было создано
+            elif time_entry_id not in entries:
+                ok = True  # таймшит уже удалён, запись на удаление обработается отдельно
+            else:
+                result["api_calls"] += 1
+                ok = _apply_upsert(db, service, employee, entries[time_entry_id], matters, activity_types)
+        except Exception as e:
+            ok = False
+            error = str(e)
+
+        if ok:
+            crud_outbox.mark_done(group, now)
+            result["processed"] += len(group)
+        else:
+            crud_outbox.mark_failed(
+                group, now, error or "Google Calendar request failed",
+                settings.CALENDAR_OUTBOX_MAX_ATTEMPTS,
+            )
+            result["failed"] += len(group)
+
+    db.commit()
+    return result
+
+
+def dispatch_calendar_outbox(db: Session, employee_id: int | None = None, batch_size: int | None = None) -> dict:
+    """Обработать по одной пачке ожидающих записей для каждого сотрудника"""
+    now = datetime.utcnow()
+    batch_size = batch_size or settings.CALENDAR_OUTBOX_BATCH_SIZE
+    employee_ids = [employee_id] if employee_id else crud_outbox.get_due_employee_ids(db, now)
+
+    totals = {"employees": 0, "processed": 0, "failed": 0, "api_calls": 0}
+    for emp_id in employee_ids:
+        try:
+            result = _dispatch_employee(db, emp_id, now, batch_size)
+        except Exception as e:
+            db.rollback()
+            print(f"Calendar outbox dispatch failed for employee {emp_id}: {e}")
+            continue
+        totals["employees"] += 1
+        for key, value in result.items():
+            totals[key] += value
+    return totals
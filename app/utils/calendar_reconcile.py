@@ -0,0 +1,127 @@
+from googleapiclient.errors import HttpError
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from app.crud.calendar_outbox import calendar_outbox as crud_outbox
+from app.crud.time_entry import time_entry as crud_time_entry
+from app.crud.time_entry_daily_rollup import time_entry_daily_rollup, rollup_key
+from app.models.calendar_outbox import OutboxOperation
+from app.models.employee import Employee
+from app.models.time_entry import TimeEntry, TimeEntryStatus
+from app.utils import google_calendar
+
+# Инкрементальная сверка календаря сотрудника с таймшитами.
+# Google отдаёт только изменения с прошлой сверки (syncToken), события пачки
+# сопоставляются с таймшитами одним запросом WHERE google_event_id IN (...).
+# Правки черновиков в календаре переносятся в таймшит; одобренные таймшиты
+# не меняются — их событие возвращается к исходному виду через outbox.
+
+# Глубина первой полной выгрузки календаря
+INITIAL_SYNC_DAYS = 365
+EVENTS_PAGE_SIZE = 250
+
+
+class CalendarReconcileError(Exception):
+    pass
+
+
+def _parse_event_time(value: dict | None) -> datetime | None:
+    if not value or 'dateTime' not in value:
+        return None  # событие на весь день — длительность не сравниваем
+    parsed = datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        return parsed
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _apply_event(db: Session, entry: TimeEntry, event: dict, report: dict) -> None:
+    if event.get('status') == 'cancelled':
+        if entry.status == TimeEntryStatus.approved:
+            # Одобренное время уже в биллинге — только отвязываем событие
+            entry.google_event_id = None
+            report["unlinked"] += 1
+        else:
+            time_entry_daily_rollup.add_entries(db, [entry], sign=-1)
+            db.delete(entry)
+            report["deleted"] += 1
+        return
+
+    start = _parse_event_time(event.get('start'))
+    end = _parse_event_time(event.get('end'))
+    if start is None or end is None:
+        return
+    new_date = start.date()
+    new_hours = round((end - start).total_seconds() / 3600, 2)
+    if new_date == entry.date and abs(new_hours - entry.hours) < 0.01:
+        return  # эхо нашего собственного изменения
+
+    if entry.status == TimeEntryStatus.approved:
+        crud_outbox.add(
+            db, employee_id=entry.employee_id, time_entry_id=entry.id,
+            operation=OutboxOperation.upsert,
+        )
+        report["reverted"] += 1
+        return
+
+    old_key, old_hours = rollup_key(entry), entry.hours
+    entry.date = new_date
+    entry.hours = new_hours
+    time_entry_daily_rollup.move_entry(db, old_key, old_hours, entry)
+    report["updated"] += 1
+
+
+def _list_changes(service, calendar_id: str, sync_token: str | None):
+    """Все изменённые события и новый nextSyncToken"""
+    params = {
+        'calendarId': calendar_id,
+        'showDeleted': True,
+        'singleEvents': True,
+        'maxResults': EVENTS_PAGE_SIZE,
+    }
+    if sync_token:
+        params['syncToken'] = sync_token
+    else:
+        params['timeMin'] = (datetime.utcnow() - timedelta(days=INITIAL_SYNC_DAYS)).isoformat() + 'Z'
+
+    page_token = None
+    while True:
+        result = service.events().list(pageToken=page_token, **params).execute()
+        yield result.get('items', []), result.get('nextSyncToken')
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return
+
+
+def reconcile_calendar(db: Session, employee: Employee) -> dict:
+    """Подтянуть изменения календаря сотрудника в таймшиты"""
+    service = google_calendar.get_calendar_service(employee)
+    if not service:
+        raise CalendarReconcileError("Calendar service unavailable")
+    calendar_id = employee.google_calendar_id or 'primary'
+
+    report = {"events": 0, "updated": 0, "deleted": 0, "unlinked": 0, "reverted": 0, "full_sync": False}
+    sync_token = employee.google_sync_token
+    try:
+        pages = list(_list_changes(service, calendar_id, sync_token))
+    except HttpError as e:
+        if e.resp.status != 410:
+            raise
+        # Токен устарел — Google требует полную пересинхронизацию
+        sync_token = None
+        pages = list(_list_changes(service, calendar_id, None))
+    report["full_sync"] = sync_token is None
+
+    next_sync_token = None
+    for events, page_sync_token in pages:
+        next_sync_token = page_sync_token or next_sync_token
+        by_id = {event['id']: event for event in events if event.get('id')}
+        report["events"] += len(by_id)
+        if not by_id:
+            continue
+        entries = crud_time_entry.get_by_event_ids(db, employee.id, list(by_id))
+        for entry in entries:
+            _apply_event(db, entry, by_id[entry.google_event_id], report)
+
+    employee.google_sync_token = next_sync_token
+    employee.google_synced_at = datetime.utcnow()
+    db.commit()
+    return report
@@ -0,0 +1,73 @@
+from sqlalchemy import update, case
+from sqlalchemy.orm import Session
+from app.crud.time_entry import time_entry as crud_time_entry
+from app.models.time_entry import TimeEntry
+from app.utils import google_calendar
+
+# Массовая выгрузка ещё не синхронизированных таймшитов в Google Calendar:
+# один SELECT с делами и типами активности, один сервис Calendar API,
+# вставка событий batch-запросами и один UPDATE с полученными google_event_id.
+
+
+def sync_unsynced_entries(db: Session, employee) -> dict:
+    """Создать события для всех таймшитов сотрудника без google_event_id"""
+    rows = crud_time_entry.get_unsynced_with_refs(db, employee.id)
+    calendar_id = employee.google_calendar_id or 'primary'
+    bodies = [
+        (entry.id, google_calendar.build_event_body(entry, matter, activity_type))
+        for entry, matter, activity_type in rows
+    ]
+    report = {"synced": 0, "failed": 0, "total": len(bodies), "errors": []}
+    if not bodies:
+        return report
+
+    service = google_calendar.get_calendar_service(employee)
+    # Не держим транзакцию открытой, пока идут запросы к Google
+    db.rollback()
+    if not service:
+        report["failed"] = len(bodies)
+        report["errors"] = [
+            {"time_entry_id": entry_id, "error": "Calendar service unavailable"}
+            for entry_id, _ in bodies
+        ]
+        return report
+
+    events = service.events()
+    results = google_calendar.execute_calendar_batch(service, [
+        (entry_id, events.insert(calendarId=calendar_id, body=body))
+        for entry_id, body in bodies
+    ])
+
+    created = {}
+    for entry_id, (response, error) in results.items():
+        if error is None and response and response.get('id'):
+            created[entry_id] = response['id']
+        else:
+            report["errors"].append({"time_entry_id": entry_id, "error": str(error or "Empty response")})
+
+    if created:
+        # Один UPDATE на всю пачку; условие IS NULL защищает от гонки с диспетчером outbox
+        stored = set(db.execute(
+            update(TimeEntry)
+            .where(TimeEntry.id.in_(list(created)), TimeEntry.google_event_id.is_(None))
+            .values(google_event_id=case(created, value=TimeEntry.id))
+            .returning(TimeEntry.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        db.commit()
+
+        # Таймшит удалили или синхронизировали параллельно — лишние события убираем
+        orphans = [event_id for entry_id, event_id in created.items() if entry_id not in stored]
+        report["errors"].extend(
+            {"time_entry_id": entry_id, "error": "Time entry was deleted or synced concurrently"}
+            for entry_id in created if entry_id not in stored
+        )
+        if orphans:
+            google_calendar.execute_calendar_batch(service, [
+                (event_id, events.delete(calendarId=calendar_id, eventId=event_id))
+                for event_id in orphans
+            ])
+        report["synced"] = len(stored)
+
+    report["failed"] = report["total"] - report["synced"]
+    return report
@@ -1,13 +1,24 @@
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 from cryptography.fernet import Fernet
+from sqlalchemy.orm.attributes import set_committed_value
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from app.config import settings
+from app.database import SessionLocal
+from app.models.employee import Employee
+import hashlib
+import httplib2
 import json
+import threading
+import time
 
 # Scopes для Google Calendar API
 # ВАЖНО: Эти scopes должны совпадать с настройками в Google Cloud Console
@@ -18,7 +29,11 @@ SCOPES = [
     'https://www.googleapis.com/auth/calendar.events'  # Управление событиями
 ]
 
+# Google принимает до 50 запросов Calendar API в одном batch-запросе
+CALENDAR_BATCH_SIZE = 50
 
+
+@lru_cache(maxsize=1)
 def get_fernet() -> Optional[Fernet]:
     """Получить Fernet для шифрования/расшифровки токенов"""
     if not settings.FERNET_KEY:
@@ -47,6 +62,41 @@ def decrypt_token(encrypted_token: Optional[str]) -> Optional[str]:
         return None
 
 
+def encrypt_credentials(credentials: Credentials) -> Optional[str]:
+    """Зашифровать access token вместе со сроком действия (для employees.google_token_encrypted)"""
+    token_data = {
+        'token': credentials.token,
+        'token_uri': credentials.token_uri,
+        'client_id': credentials.client_id,
+        'client_secret': credentials.client_secret,
+        'scopes': credentials.scopes,
+        'expiry': credentials.expiry.isoformat() if credentials.expiry else None,
+    }
+    return encrypt_token(json.dumps(token_data))
+
+
+def _store_refreshed_token(employee, credentials: Credentials) -> None:
+    """Сохранить обновлённый access token в БД в зашифрованном виде"""
+    encrypted = encrypt_credentials(credentials)
+    if not encrypted:
+        return
+    # Отдельная короткая сессия: не вмешиваемся в транзакцию вызывающего кода
+    db = SessionLocal()
+    try:
+        db.query(Employee).filter(Employee.id == employee.id).update(
+            {Employee.google_token_encrypted: encrypted}, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error storing refreshed Google token: {e}")
+        return
+    finally:
+        db.close()
+    # Объект сотрудника не помечаем изменённым — значение уже в БД
+    set_committed_value(employee, 'google_token_encrypted', encrypted)
+
+
 def get_google_credentials(employee) -> Optional[Credentials]:
     """Получить Google Credentials из зашифрованных токенов сотрудника"""
     if not employee.google_token_encrypted:
@@ -58,19 +108,22 @@ def get_google_credentials(employee) -> Optional[Credentials]:
     
     try:
         token_data = json.loads(token_json)
+        expiry = token_data.get('expiry')
         credentials = Credentials(
             token=token_data.get('token'),
             refresh_token=decrypt_token(employee.google_refresh_token_encrypted),
             token_uri=token_data.get('token_uri', 'https://oauth2.googleapis.com/token'),
             client_id=settings.GOOGLE_CLIENT_ID,
             client_secret=settings.GOOGLE_CLIENT_SECRET,
-            scopes=SCOPES
+            scopes=SCOPES,
+            expiry=datetime.fromisoformat(expiry) if expiry else None,
         )
         
         # Проверяем и обновляем токен, если нужно
         if credentials.expired and credentials.refresh_token:
             try:
                 credentials.refresh(Request())
+                _store_refreshed_token(employee, credentials)
             except Exception:
                 pass  # Если не удалось обновить, вернем истекший токен
         
@@ -80,26 +133,122 @@ def get_google_credentials(employee) -> Optional[Credentials]:
         return None
 
 
+# --- Кэш клиентов Calendar API ---
+# Расшифровка токенов и сборка сервиса (разбор discovery-документа) — самая
+# дорогая часть каждого обращения к календарю, поэтому держим готовые
+# Credentials и сервис на сотрудника. Запись кэша привязана к отпечатку
+# зашифрованных токенов: после переподключения Google она пересобирается.
+
+CALENDAR_CLIENT_CACHE_SIZE = 256
+CALENDAR_CLIENT_CACHE_TTL = 30 * 60  # секунд
+
+
+class _ThreadLocalAuthorizedHttp:
+    """httplib2.Http не потокобезопасен: общий сервис, но свой транспорт на поток"""
+
+    def __init__(self, credentials: Credentials):
+        self.credentials = credentials
+        self._local = threading.local()
+
+    def _http(self) -> AuthorizedHttp:
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=30))
+            self._local.http = http
+        return http
+
+    def request(self, *args, **kwargs):
+        return self._http().request(*args, **kwargs)
+
+    def close(self):
+        http = getattr(self._local, 'http', None)
+        if http is not None:
+            http.close()
+
+
+class _CalendarClient:
+    def __init__(self, fingerprint: str, credentials: Credentials, service):
+        self.fingerprint = fingerprint
+        self.credentials = credentials
+        self.service = service
+        self.persisted_token = credentials.token
+        self.created_at = time.monotonic()
+
+
+_client_cache: "OrderedDict[int, _CalendarClient]" = OrderedDict()
+_client_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _calendar_discovery_document() -> str:
+    return get_static_doc('calendar', 'v3')
+
+
+def _token_fingerprint(employee) -> str:
+    raw = f"{employee.google_token_encrypted}|{employee.google_refresh_token_encrypted}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def invalidate_calendar_client(employee_id: int) -> None:
+    """Сбросить закэшированные Credentials и сервис сотрудника"""
+    with _client_cache_lock:
+        _client_cache.pop(employee_id, None)
+
+
+def _get_cached_client(employee) -> Optional[_CalendarClient]:
+    fingerprint = _token_fingerprint(employee)
+    with _client_cache_lock:
+        client = _client_cache.get(employee.id)
+        if client is not None:
+            fresh = time.monotonic() - client.created_at < CALENDAR_CLIENT_CACHE_TTL
+            if fresh and client.fingerprint == fingerprint:
+                _client_cache.move_to_end(employee.id)
+                return client
+            _client_cache.pop(employee.id, None)
+    return None
+
+
+def _put_cached_client(employee_id: int, client: _CalendarClient) -> None:
+    with _client_cache_lock:
+        _client_cache[employee_id] = client
+        _client_cache.move_to_end(employee_id)
+        while len(_client_cache) > CALENDAR_CLIENT_CACHE_SIZE:
+            _client_cache.popitem(last=False)
+
+
 def get_calendar_service(employee) -> Optional[object]:
     """Получить сервис Google Calendar API"""
+    client = _get_cached_client(employee)
+    if client is not None:
+        credentials = client.credentials
+        if credentials.expired and credentials.refresh_token:
+            try:
+                credentials.refresh(Request())
+            except Exception:
+                pass
+        # Токен мог обновиться здесь или внутри AuthorizedHttp после 401
+        if credentials.token != client.persisted_token:
+            _store_refreshed_token(employee, credentials)
+            client.persisted_token = credentials.token
+            client.fingerprint = _token_fingerprint(employee)
+        return client.service
+
     credentials = get_google_credentials(employee)
     if not credentials:
         return None
     try:
-        return build('calendar', 'v3', credentials=credentials)
+        service = build_from_document(
+            _calendar_discovery_document(), http=_ThreadLocalAuthorizedHttp(credentials)
+        )
     except Exception as e:
         print(f"Error building calendar service: {e}")
         return None
+    _put_cached_client(employee.id, _CalendarClient(_token_fingerprint(employee), credentials, service))
+    return service
 
 
-def create_calendar_event(employee, time_entry, matter, activity_type) -> Optional[str]:
-    """Создать событие в Google Calendar для таймшита"""
-    service = get_calendar_service(employee)
-    if not service:
-        return None
-    
-    calendar_id = employee.google_calendar_id or 'primary'
-    
+def build_event_body(time_entry, matter, activity_type) -> dict:
+    """Сформировать событие календаря по таймшиту"""
     # Формируем название события
     event_title = f"{matter.code} - {matter.name}"
     if activity_type:
@@ -115,7 +264,7 @@ def create_calendar_event(employee, time_entry, matter, activity_type) -> Option
         description += f"Описание: {time_entry.description}\n"
     description += f"Статус: {time_entry.status}"
     
-    event = {
+    return {
         'summary': event_title,
         'description': description,
         'start': {
@@ -127,6 +276,16 @@ def create_calendar_event(employee, time_entry, matter, activity_type) -> Option
             'timeZone': 'UTC',
         },
     }
+
+
+def create_calendar_event(employee, time_entry, matter, activity_type, service=None) -> Optional[str]:
+    """Создать событие в Google Calendar для таймшита"""
+    service = service or get_calendar_service(employee)
+    if not service:
+        return None
+    
+    calendar_id = employee.google_calendar_id or 'primary'
+    event = build_event_body(time_entry, matter, activity_type)
     
     try:
         event_result = service.events().insert(calendarId=calendar_id, body=event).execute()
@@ -136,9 +295,9 @@ def create_calendar_event(employee, time_entry, matter, activity_type) -> Option
         return None
 
 
-def update_calendar_event(employee, time_entry, matter, activity_type, event_id: str) -> Optional[str]:
+def update_calendar_event(employee, time_entry, matter, activity_type, event_id: str, service=None) -> Optional[str]:
     """Обновить событие в Google Calendar"""
-    service = get_calendar_service(employee)
+    service = service or get_calendar_service(employee)
     if not service:
         return None
     
@@ -152,28 +311,7 @@ def update_calendar_event(employee, time_entry, matter, activity_type, event_id:
         return None
     
     # Обновляем данные события
-    event_title = f"{matter.code} - {matter.name}"
-    if activity_type:
-        event_title += f" ({activity_type.name})"
-    
-    start_datetime = datetime.combine(time_entry.date, datetime.min.time())
-    end_datetime = start_datetime + timedelta(hours=time_entry.hours)
-    
-    description = f"Часы: {time_entry.hours}\n"
-    if time_entry.description:
-        description += f"Описание: {time_entry.description}\n"
-    description += f"Статус: {time_entry.status}"
-    
-    event['summary'] = event_title
-    event['description'] = description
-    event['start'] = {
-        'dateTime': start_datetime.isoformat(),
-        'timeZone': 'UTC',
-    }
-    event['end'] = {
-        'dateTime': end_datetime.isoformat(),
-        'timeZone': 'UTC',
-    }
+    event.update(build_event_body(time_entry, matter, activity_type))
     
     try:
         updated_event = service.events().update(
@@ -187,9 +325,9 @@ def update_calendar_event(employee, time_entry, matter, activity_type, event_id:
         return None
 
 
-def delete_calendar_event(employee, event_id: str) -> bool:
+def delete_calendar_event(employee, event_id: str, service=None) -> bool:
     """Удалить событие из Google Calendar"""
-    service = get_calendar_service(employee)
+    service = service or get_calendar_service(employee)
     if not service:
         return False
     
@@ -199,10 +337,31 @@ def delete_calendar_event(employee, event_id: str) -> bool:
         service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
         return True
     except HttpError as e:
+        if e.resp.status in (404, 410):
+            return True  # событие уже удалено в календаре
         print(f"Error deleting calendar event: {e}")
         return False
 
 
+def execute_calendar_batch(service, requests: list) -> dict:
+    """
+    Выполнить запросы к Calendar API пачками через batch HTTP.
+    requests — список пар (ключ, HttpRequest); результат — {ключ: (ответ, ошибка)}.
+    """
+    results = {}
+
+    def callback(request_id, response, exception):
+        results[request_id] = (response, exception)
+
+    for start in range(0, len(requests), CALENDAR_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=callback)
+        for key, request in requests[start:start + CALENDAR_BATCH_SIZE]:
+            batch.add(request, request_id=str(key))
+        batch.execute()
+
+    return {key: results.get(str(key), (None, None)) for key, _ in requests}
+
+
 def create_legal_time_calendar(employee) -> Optional[str]:
     """Создать отдельный календарь LegalTime для пользователя"""
     service = get_calendar_service(employee)
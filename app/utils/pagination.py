@@ -0,0 +1,82 @@
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from fastapi import HTTPException, Response
+from datetime import date, datetime
+import base64
+import json
+
+# Keyset-пагинация: вместо OFFSET клиент получает непрозрачный курсор
+# (значения ключей сортировки последней строки) в заголовке X-Next-Cursor
+# и передаёт его в ?cursor=... за следующей страницей.
+
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    """Разобрать курсор; значения приводятся к типам колонок сортировки"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor shape mismatch")
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is not None and python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_query(query, columns: list, cursor: str | None, limit: int, descending: bool = False):
+    """
+    Условие курсора, сортировка и LIMIT limit + 1 (лишняя строка — признак
+    следующей страницы). Подходит и для Query, и для select().
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    key = tuple_(*columns) if len(columns) > 1 else columns[0]
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        bound = tuple_(*values) if len(columns) > 1 else values[0]
+        query = query.filter(key < bound if descending else key > bound)
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def page_result(rows: list, columns: list, limit: int):
+    """(строки страницы, курсор следующей страницы или None) из результата keyset_query"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+    return rows, next_cursor
+
+
+def paginate(query: Query, columns: list, cursor: str | None, limit: int, descending: bool = False):
+    """
+    Страница query, упорядоченная по columns (последняя колонка — уникальный id).
+    Возвращает (строки, курсор следующей страницы или None).
+    """
+    rows = keyset_query(query, columns, cursor, limit, descending).all()
+    return page_result(rows, columns, limit)
+
+
+async def paginate_async(db, statement, columns: list, cursor: str | None, limit: int, descending: bool = False):
+    """То же для select() сущности в AsyncSession"""
+    rows = (await db.scalars(keyset_query(statement, columns, cursor, limit, descending))).all()
+    return page_result(list(rows), columns, limit)
+
+
+def set_next_cursor(response: Response, next_cursor: str | None) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,134 @@
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from threading import Lock
+import time
+from app.config import settings
+from app.models.matter import Matter
+from app.models.rate import Rate
+
+# Определение действующей ставки таймшита. Порядок приоритета:
+#   1. ставка, явно указанная в таймшите (rate_id);
+#   2. ставка сотрудника по договору (employee_id + contract_id);
+#   3. ставка договора (только contract_id);
+#   4. персональная ставка сотрудника (только employee_id);
+#   5. ставка по умолчанию (без сотрудника и договора).
+# Если на один ключ заведено несколько ставок, действует последняя (больший id).
+#
+# Все ставки держатся в памяти индексом по (employee_id, contract_id).
+# Индекс сбрасывается после коммита, изменившего ставки в этом процессе,
+# и не живёт дольше RATE_INDEX_TTL_SECONDS (изменения из других процессов).
+
+
+class RateIndex:
+    def __init__(self, rates: list[tuple[int, float, int | None, int | None]]):
+        self.by_id: dict[int, float] = {}
+        self.by_key: dict[tuple[int | None, int | None], tuple[int, float]] = {}
+        for rate_id, value, employee_id, contract_id in sorted(rates):
+            self.by_id[rate_id] = value
+            self.by_key[(employee_id, contract_id)] = (rate_id, value)
+
+    def resolve(
+        self, employee_id: int, contract_id: int | None, rate_id: int | None = None
+    ) -> tuple[int, float] | None:
+        """(id, значение) действующей ставки или None"""
+        if rate_id is not None and rate_id in self.by_id:
+            return rate_id, self.by_id[rate_id]
+        for key in ((employee_id, contract_id), (None, contract_id), (employee_id, None), (None, None)):
+            found = self.by_key.get(key)
+            if found:
+                return found
+        return None
+
+
+def load_rate_index(db: Session) -> RateIndex:
+    return RateIndex(db.query(Rate.id, Rate.value, Rate.employee_id, Rate.contract_id).all())
+
+
+_index: RateIndex | None = None
+_index_loaded_at = 0.0
+_index_generation = 0  # увеличивается при сбросе: загрузка, начатая раньше, не сохраняется
+_index_lock = Lock()
+# Под блокировкой только чтение и подмена ссылки, без запросов к базе:
+# в async-коде запрос внутри run_sync отдаёт управление циклу событий,
+# и следующая корутина заблокировала бы поток цикла на этом Lock.
+
+
+def _cached_index() -> tuple[RateIndex | None, int]:
+    with _index_lock:
+        if _index is not None and time.monotonic() - _index_loaded_at <= settings.RATE_INDEX_TTL_SECONDS:
+            return _index, _index_generation
+        return None, _index_generation
+
+
+def _store_index(index: RateIndex, generation: int) -> RateIndex:
+    global _index, _index_loaded_at
+    with _index_lock:
+        if generation == _index_generation:
+            _index = index
+            _index_loaded_at = time.monotonic()
+    return index
+
+
+def get_rate_index(db: Session) -> RateIndex:
+    """Общий индекс ставок процесса (перестраивается после изменений или по TTL)"""
+    index, generation = _cached_index()
+    if index is None:
+        index = _store_index(load_rate_index(db), generation)
+    return index
+
+
+async def get_rate_index_async(db: AsyncSession) -> RateIndex:
+    """То же для AsyncSession"""
+    index, generation = _cached_index()
+    if index is None:
+        rows = (await db.execute(select(Rate.id, Rate.value, Rate.employee_id, Rate.contract_id))).all()
+        index = _store_index(RateIndex(rows), generation)
+    return index
+
+
+def invalidate_rate_index():
+    global _index, _index_generation
+    with _index_lock:
+        _index = None
+        _index_generation += 1
+
+
+@event.listens_for(Session, "after_flush")
+def _remember_rate_changes(session, flush_context):
+    if any(isinstance(obj, Rate) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["rates_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("rates_changed", False):
+        invalidate_rate_index()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rate_changes(session):
+    session.info.pop("rates_changed", None)
+
+
+def amount_for(hours: float, rate: float | None) -> float | None:
+    return round(hours * rate, 2) if rate is not None else None
+
+
+def apply_rates(db: Session, entries: list, index: RateIndex | None = None) -> list:
+    """
+    Проставить таймшитам effective_rate_id, effective_rate и amount.
+    Договоры дел читаются одним запросом, ставки — из индекса.
+    """
+    if not entries:
+        return entries
+    index = index or get_rate_index(db)
+    matter_ids = {entry.matter_id for entry in entries}
+    contract_by_matter = dict(
+        db.query(Matter.id, Matter.contract_id).filter(Matter.id.in_(matter_ids)).all()
+    )
+    for entry in entries:
+        resolved = index.resolve(entry.employee_id, contract_by_matter.get(entry.matter_id), entry.rate_id)
+        entry.effective_rate_id, entry.effective_rate = resolved if resolved else (None, None)
+        entry.amount = amount_for(entry.hours, entry.effective_rate)
+    return entries
@@ -0,0 +1,101 @@
+from sqlalchemy import Date, cast, func
+from sqlalchemy.orm import Session
+from app.crud.time_entry import time_entry as crud_time_entry
+from app.models.activity_type import ActivityType
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.employee import Employee
+from app.models.matter import Matter
+from app.models.time_entry_daily_rollup import TimeEntryDailyRollup
+from app.schemas.report import HoursReport, HoursRollupRow, HoursTotals
+from app.schemas.time_entry import TimeEntryFilter
+
+# Свёртки часов считаются в базе одним GROUP BY по дневной свёртке
+# time_entry_daily_rollup (а не по всем таймшитам); в Python приходят
+# только агрегированные строки. Итоги по статусам — отдельной свёрткой,
+# чтобы не зависеть от выбранных разрезов.
+
+
+def period_start(db: Session, period: str, column=TimeEntryDailyRollup.date):
+    """Выражение начала периода для колонки даты с учётом диалекта"""
+    if period == "day":
+        return column
+    if db.get_bind().dialect.name == "sqlite":
+        if period == "week":
+            # Ближайшее воскресенье (включительно) минус 6 дней — понедельник недели
+            return func.date(column, "weekday 0", "-6 days", type_=Date)
+        return func.date(column, "start of month", type_=Date)
+    return cast(func.date_trunc(period, column), Date)
+
+
+def _dimension_columns(db: Session, dimension: str, period: str) -> list:
+    if dimension == "employee":
+        return [Employee.id.label("employee_id"), Employee.name.label("employee_name")]
+    if dimension == "matter":
+        return [Matter.id.label("matter_id"), Matter.code.label("matter_code"), Matter.name.label("matter_name")]
+    if dimension == "contract":
+        return [Contract.id.label("contract_id"), Contract.number.label("contract_number")]
+    if dimension == "client":
+        return [Client.id.label("client_id"), Client.name.label("client_name")]
+    if dimension == "activity_type":
+        return [ActivityType.id.label("activity_type_id"), ActivityType.name.label("activity_type_name")]
+    if dimension == "status":
+        return [TimeEntryDailyRollup.status.label("status")]
+    return [period_start(db, period).label("period")]
+
+
+def hours_rollup(
+    db: Session,
+    filters: TimeEntryFilter,
+    group_by: list[str],
+    period: str = "month",
+) -> list[HoursRollupRow]:
+    """Часы и число записей в разрезе group_by"""
+    dimensions = list(dict.fromkeys(group_by))  # без повторов, порядок сохраняем
+    columns = [column for dimension in dimensions for column in _dimension_columns(db, dimension, period)]
+    query = db.query(
+        *columns,
+        func.coalesce(func.sum(TimeEntryDailyRollup.hours), 0).label("hours"),
+        func.coalesce(func.sum(TimeEntryDailyRollup.entries), 0).label("entries"),
+    ).select_from(TimeEntryDailyRollup)
+
+    if "employee" in dimensions:
+        query = query.join(Employee, Employee.id == TimeEntryDailyRollup.employee_id)
+    if {"matter", "contract", "client"} & set(dimensions):
+        query = query.join(Matter, Matter.id == TimeEntryDailyRollup.matter_id)
+    if {"contract", "client"} & set(dimensions):
+        query = query.join(Contract, Contract.id == Matter.contract_id)
+    if "client" in dimensions:
+        query = query.join(Client, Client.id == Contract.client_id)
+    if "activity_type" in dimensions:
+        query = query.join(ActivityType, ActivityType.id == TimeEntryDailyRollup.activity_type_id)
+
+    query = crud_time_entry.filter_query(db, filters, query=query, model=TimeEntryDailyRollup)
+    if columns:
+        query = query.group_by(*columns).order_by(*columns)
+
+    rows = []
+    for row in query.all():
+        values = row._asdict()
+        if values.get("status") is not None:
+            values["status"] = getattr(values["status"], "value", values["status"])
+        rows.append(HoursRollupRow(**values))
+    return rows
+
+
+def hours_report(
+    db: Session,
+    filters: TimeEntryFilter,
+    group_by: list[str],
+    period: str = "month",
+) -> HoursReport:
+    rows = hours_rollup(db, filters, group_by, period)
+    totals = HoursTotals()
+    for row in hours_rollup(db, filters, ["status"], period):
+        totals.hours += row.hours
+        totals.entries += row.entries
+        if row.status == "draft":
+            totals.draft_hours, totals.draft_entries = row.hours, row.entries
+        elif row.status == "approved":
+            totals.approved_hours, totals.approved_entries = row.hours, row.entries
+    return HoursReport(group_by=list(dict.fromkeys(group_by)), period=period, rows=rows, totals=totals)
@@ -0,0 +1,126 @@
+from sqlalchemy.orm import Session
+from datetime import date
+import csv
+import io
+import json
+from app.crud.time_entry import time_entry as crud_time_entry
+from app.models.activity_type import ActivityType
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.employee import Employee
+from app.models.matter import Matter
+from app.models.time_entry import TimeEntry
+from app.schemas.time_entry import TimeEntryFilter
+from app.utils.rates import get_rate_index, amount_for
+
+# Выгрузка таймшитов для биллинга. Строки читаются серверным курсором
+# порциями по EXPORT_CHUNK_SIZE и сразу пишутся в поток ответа, поэтому
+# память не зависит от числа строк. ORM-объекты не создаются, ставка
+# определяется по индексу ставок в памяти (без запроса на строку).
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_COLUMNS = [
+    "id",
+    "date",
+    "employee_id",
+    "employee_name",
+    "client_id",
+    "client_name",
+    "contract_id",
+    "contract_number",
+    "matter_id",
+    "matter_code",
+    "matter_name",
+    "activity_type_id",
+    "activity_type_name",
+    "description",
+    "status",
+    "hours",
+    "rate_id",
+    "effective_rate_id",
+    "rate",
+    "amount",
+]
+
+
+def export_select(db: Session, filters: TimeEntryFilter):
+    """Таймшиты с названиями связанных сущностей (без сортировки)"""
+    query = (
+        db.query(
+            TimeEntry.id,
+            TimeEntry.date,
+            TimeEntry.employee_id,
+            Employee.name.label("employee_name"),
+            Client.id.label("client_id"),
+            Client.name.label("client_name"),
+            Contract.id.label("contract_id"),
+            Contract.number.label("contract_number"),
+            TimeEntry.matter_id,
+            Matter.code.label("matter_code"),
+            Matter.name.label("matter_name"),
+            TimeEntry.activity_type_id,
+            ActivityType.name.label("activity_type_name"),
+            TimeEntry.description,
+            TimeEntry.status,
+            TimeEntry.hours,
+            TimeEntry.rate_id,
+        )
+        .select_from(TimeEntry)
+        .join(Employee, Employee.id == TimeEntry.employee_id)
+        .join(Matter, Matter.id == TimeEntry.matter_id)
+        .join(Contract, Contract.id == Matter.contract_id)
+        .join(Client, Client.id == Contract.client_id)
+        .join(ActivityType, ActivityType.id == TimeEntry.activity_type_id)
+    )
+    return crud_time_entry.filter_query(db, filters, query=query)
+
+
+def export_query(db: Session, filters: TimeEntryFilter):
+    """Строки выгрузки по порядку (date, id)"""
+    # yield_per включает stream_results: на PostgreSQL это серверный курсор
+    return export_select(db, filters).order_by(TimeEntry.date, TimeEntry.id).yield_per(EXPORT_CHUNK_SIZE)
+
+
+def iter_export_records(db: Session, filters: TimeEntryFilter):
+    """Строки выгрузки в виде словарей EXPORT_COLUMNS"""
+    rates = get_rate_index(db)
+    for row in export_query(db, filters):
+        record = row._asdict()
+        record["status"] = getattr(record["status"], "value", record["status"])
+        resolved = rates.resolve(record["employee_id"], record["contract_id"], record["rate_id"])
+        record["effective_rate_id"], record["rate"] = resolved if resolved else (None, None)
+        record["amount"] = amount_for(record["hours"], record["rate"])
+        yield record
+
+
+def _chunks(records, size: int = EXPORT_CHUNK_SIZE):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue()
+    for chunk in _chunks(records):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+
+
+def iter_ndjson(records):
+    for chunk in _chunks(records):
+        yield "".join(
+            json.dumps(record, ensure_ascii=False, default=lambda v: v.isoformat() if isinstance(v, date) else str(v))
+            + "\n"
+            for record in chunk
+        )
@@ -0,0 +1,37 @@
+from celery import Celery
+from app.config import settings
+
+# Celery-приложение для фоновых задач (синхронизация с Google Calendar и т.п.)
+# Запуск воркера: celery -A app.worker worker --loglevel=info
+celery_app = Celery(
+    "legal_time",
+    broker=settings.CELERY_BROKER_URL or "memory://",
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.tasks.calendar"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    timezone="UTC",
+    # Задача подтверждается только после выполнения: если воркер упал,
+    # брокер отдаст её другому воркеру
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    # Без брокера (локальная разработка, тесты) задачи выполняются сразу в процессе
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER or not settings.CELERY_BROKER_URL,
+    # celery -A app.worker beat — периодически разбирает calendar_outbox,
+    # подбирая то, что не успели «пнуть» роутеры, и повторы после ошибок
+    beat_schedule={
+        "dispatch-calendar-outbox": {
+            "task": "app.tasks.calendar.dispatch_calendar_outbox",
+            "schedule": settings.CALENDAR_OUTBOX_POLL_SECONDS,
+        },
+        "reconcile-calendars": {
+            "task": "app.tasks.calendar.reconcile_calendars",
+            "schedule": settings.CALENDAR_RECONCILE_INTERVAL_SECONDS,
+        },
+    },
+)
@@ -0,0 +1,142 @@
+"""Бенчмарк предпросмотра счёта /api/billing/preview на большом наборе таймшитов
+
+Генерирует N таймшитов (по умолчанию 1 000 000) по делам одного клиента
+и сравнивает расчёт счёта над массивами NumPy (app/utils/billing.py)
+с наивным циклом по ORM-объектам. Итоговые суммы обоих способов сверяются.
+
+ВНИМАНИЕ: таблицы базы из DATABASE_URL очищаются.
+
+    python benchmark_billing.py --rows 1000000
+    python benchmark_billing.py --skip-seed   # данные уже сгенерированы
+"""
+import sys
+import math
+import time
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from datetime import date, timedelta
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy.orm import joinedload
+from app.database import SessionLocal
+from app.models import *  # noqa: F401,F403
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.employee import Employee
+from app.models.matter import Matter
+from app.models.time_entry import TimeEntry
+from app.config import settings
+from app.utils.billing import billing_preview, compute_billing, load_billing_columns
+from app.utils.rates import get_rate_index
+from benchmark_reports import DAYS, seed_bulk_time_entries
+from seed_database import seed_rates
+
+
+def seed(db, rows: int):
+    seed_bulk_time_entries(db, rows, client_index=0)
+    employees = db.query(Employee).order_by(Employee.id).all()
+    contracts = db.query(Contract).order_by(Contract.id).all()
+    seed_rates(db, employees, contracts)
+
+
+def orm_billing(db, client_id: int, date_from: date, date_to: date, increment: float) -> dict:
+    """Прежний подход: загрузить таймшиты ORM-объектами и считать в цикле (с черновиками)"""
+    index = get_rate_index(db)
+    by_matter = defaultdict(float)
+    by_contract = defaultdict(float)
+    by_employee = defaultdict(float)
+    total = 0.0
+    entries = (
+        db.query(TimeEntry)
+        .options(joinedload(TimeEntry.matter))
+        .join(Matter, Matter.id == TimeEntry.matter_id)
+        .join(Contract, Contract.id == Matter.contract_id)
+        .filter(
+            Contract.client_id == client_id,
+            TimeEntry.date >= date_from,
+            TimeEntry.date <= date_to,
+        )
+        .all()
+    )
+    for entry in entries:
+        found = index.resolve(entry.employee_id, entry.matter.contract_id, entry.rate_id)
+        if not found:
+            continue
+        billable = round(math.ceil(round(entry.hours / increment, 6)) * increment, 6)
+        amount = round(billable * found[1], 2)
+        by_matter[entry.matter_id] += amount
+        by_contract[entry.matter.contract_id] += amount
+        by_employee[entry.employee_id] += amount
+        total += amount
+    db.expunge_all()
+    return {"entries": len(entries), "amount": round(total, 2), "matters": len(by_matter)}
+
+
+def timed(label: str, fn, repeat: int, rows: int):
+    """Лучшее время из repeat запусков и пропускная способность в строках в секунду"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"   {label:<42} {best * 1000:10.1f} ms {rows / best:14,.0f} строк/с")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not args.skip_seed:
+            seed(db, args.rows)
+        client = db.query(Client).order_by(Client.id).first()
+        date_to = date.today()
+        date_from = date_to - timedelta(days=DAYS)
+        increment = settings.BILLING_HOURS_INCREMENT
+
+        columns = load_billing_columns(db, client.id, date_from, date_to, include_drafts=True)
+        rows = len(columns["hours"])
+        print(f"\n🧾 Счёт клиенту «{client.name}»: {rows:,} таймшитов с черновиками (лучшее из {args.repeat})")
+
+        index = get_rate_index(db)
+        computed = timed(
+            "NumPy: только расчёт (compute_billing)",
+            lambda: compute_billing(columns, index, increment),
+            args.repeat,
+            rows,
+        )
+        preview = timed(
+            "NumPy: запрос + расчёт (billing_preview)",
+            lambda: billing_preview(db, client, date_from, date_to, True, increment),
+            args.repeat,
+            rows,
+        )
+        naive = timed(
+            "ORM-объекты в цикле",
+            lambda: orm_billing(db, client.id, date_from, date_to, increment),
+            1,
+            rows,
+        )
+
+        print(f"\n   сумма: NumPy {preview.amount:,.2f}, ORM {naive['amount']:,.2f}")
+        if not math.isclose(computed["amount"], naive["amount"], rel_tol=1e-9):
+            print("❌ Суммы расходятся")
+            return 1
+        print("✅ Суммы совпадают")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Бенчмарк отчёта /api/reports/hours на большом наборе таймшитов
+
+Заполняет базу справочниками из seed_database.py и генерирует N таймшитов
+(по умолчанию 1 000 000), затем сравнивает отчёт (GROUP BY по дневной
+свёртке) с подсчётом в Python по всем строкам — так, как раньше считал Dashboard.
+
+ВНИМАНИЕ: таблицы базы из DATABASE_URL очищаются.
+
+    python benchmark_reports.py --rows 1000000
+    python benchmark_reports.py --skip-seed   # данные уже сгенерированы
+"""
+import sys
+import time
+import random
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from datetime import date, timedelta
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.database import SessionLocal
+from app.models import *  # noqa: F401,F403
+from app.models.time_entry import TimeEntry, TimeEntryStatus
+from app.crud.time_entry_daily_rollup import time_entry_daily_rollup
+from app.schemas.time_entry import TimeEntryFilter
+from app.utils.reports import hours_report
+from seed_database import (
+    clear_database,
+    seed_employees,
+    seed_clients,
+    seed_contracts,
+    seed_activity_types,
+    seed_matters,
+)
+
+CHUNK_SIZE = 20_000
+DAYS = 730  # два года истории
+
+
+def seed_bulk_time_entries(db, rows: int, seed: int = 42, client_index: int | None = None):
+    """
+    Справочники + rows таймшитов пачками по CHUNK_SIZE (без ORM-объектов).
+    client_index — все таймшиты только по делам этого клиента (из seed_clients).
+    """
+    clear_database(db)
+    employees = seed_employees(db)
+    clients = seed_clients(db)
+    contracts = seed_contracts(db, clients)
+    activity_types = seed_activity_types(db)
+    matters = seed_matters(db, contracts)
+
+    print(f"\n⏱️  Генерация таймшитов: {rows:,}...")
+    rnd = random.Random(seed)
+    employee_ids = [e.id for e in employees]
+    if client_index is not None:
+        matters = [m for m in matters if m.contract.client_id == clients[client_index].id]
+    matter_ids = [m.id for m in matters]
+    activity_ids = [a.id for a in activity_types]
+    start = date.today() - timedelta(days=DAYS)
+    table = TimeEntry.__table__
+
+    started = time.perf_counter()
+    for offset in range(0, rows, CHUNK_SIZE):
+        chunk = [
+            {
+                "employee_id": rnd.choice(employee_ids),
+                "matter_id": rnd.choice(matter_ids),
+                "activity_type_id": rnd.choice(activity_ids),
+                "hours": round(rnd.uniform(0.25, 8.0), 2),
+                "date": start + timedelta(days=rnd.randrange(DAYS)),
+                "status": rnd.choice([TimeEntryStatus.draft, TimeEntryStatus.approved]),
+                "google_event_id": None,
+            }
+            for _ in range(min(CHUNK_SIZE, rows - offset))
+        ]
+        db.execute(table.insert(), chunk)
+        db.commit()
+    print(f"✅ Создано таймшитов: {rows:,} за {time.perf_counter() - started:.1f}s")
+
+    # Вставка мимо CRUD — дневную свёртку пересчитываем целиком
+    started = time.perf_counter()
+    rollup_rows = time_entry_daily_rollup.rebuild(db)
+    print(f"✅ Дневная свёртка: {rollup_rows:,} строк за {time.perf_counter() - started:.1f}s")
+
+
+def python_rollup(db, group_by: list[str], period: str) -> int:
+    """Прежний подход: выгрузить все строки и сложить часы в Python"""
+    totals = defaultdict(float)
+    query = db.query(
+        TimeEntry.employee_id, TimeEntry.matter_id, TimeEntry.activity_type_id,
+        TimeEntry.status, TimeEntry.date, TimeEntry.hours,
+    )
+    for employee_id, matter_id, activity_type_id, status, entry_date, hours in query.yield_per(CHUNK_SIZE):
+        if period == "week":
+            bucket = entry_date - timedelta(days=entry_date.weekday())
+        else:
+            bucket = entry_date.replace(day=1)
+        values = {
+            "employee": employee_id, "matter": matter_id, "activity_type": activity_type_id,
+            "status": status, "period": bucket,
+        }
+        totals[tuple(values[d] for d in group_by)] += hours
+    return len(totals)
+
+
+def timed(label: str, fn, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"   {label:<45} {best * 1000:10.1f} ms")
+    return result
+
+
+SCENARIOS = [
+    (["status"], "month"),
+    (["employee", "period"], "month"),
+    (["employee", "matter", "period", "status"], "week"),
+    (["employee", "matter", "period", "status", "activity_type"], "month"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not args.skip_seed:
+            seed_bulk_time_entries(db, args.rows)
+        total = db.query(TimeEntry).count()
+        print(f"\n📊 Таймшитов в базе: {total:,} (лучшее из {args.repeat})")
+
+        for group_by, period in SCENARIOS:
+            print(f"\n🔎 group_by={','.join(group_by)} period={period}")
+            report = timed(
+                "SQL GROUP BY (hours_report)",
+                lambda: hours_report(db, TimeEntryFilter(), group_by, period),
+                args.repeat,
+            )
+            groups = timed(
+                "Python по всем строкам",
+                lambda: python_rollup(db, group_by, period),
+                args.repeat,
+            )
+            print(f"   групп: SQL {len(report.rows):,}, Python {groups:,}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Выгрузка таймшитов в Parquet для аналитического хранилища финансов
+
+Файлы раскладываются по партициям month=YYYY-MM/client_id=N (hive-формат).
+Строки читаются из базы порциями (серверный курсор) и сразу превращаются
+в Arrow record batch — ORM-объекты не создаются.
+
+Выгрузка инкрементальная: в OUT/_watermark.json хранится последний
+выгруженный id, следующий запуск берёт только записи с большим id.
+В time_entries нет отметки времени изменения, поэтому правки уже
+выгруженных записей подхватывает только полная выгрузка (--full).
+
+    python export_parquet.py --out warehouse/time_entries
+    python export_parquet.py --out warehouse/time_entries --full
+    python export_parquet.py --out /tmp/te --full --benchmark   # + замер CSV-выгрузки
+
+Нужен pyarrow: pip install pyarrow
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    print("❌ Для выгрузки в Parquet нужен pyarrow: pip install pyarrow")
+    sys.exit(1)
+
+from app.database import SessionLocal
+from app.models import *  # noqa: F401,F403
+from app.models.time_entry import TimeEntry
+from app.schemas.time_entry import TimeEntryFilter
+from app.utils.rates import get_rate_index
+from app.utils.time_entry_export import export_select, iter_export_records, iter_csv
+
+CHUNK_SIZE = 50_000
+WATERMARK_FILE = "_watermark.json"
+
+# Колонки в порядке export_select
+SOURCE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("date", pa.date32()),
+    ("employee_id", pa.int64()),
+    ("employee_name", pa.string()),
+    ("client_id", pa.int64()),
+    ("client_name", pa.string()),
+    ("contract_id", pa.int64()),
+    ("contract_number", pa.string()),
+    ("matter_id", pa.int64()),
+    ("matter_code", pa.string()),
+    ("matter_name", pa.string()),
+    ("activity_type_id", pa.int64()),
+    ("activity_type_name", pa.string()),
+    ("description", pa.string()),
+    ("status", pa.string()),
+    ("hours", pa.float64()),
+    ("rate_id", pa.int64()),
+])
+# + действующая ставка, сумма и ключ партиции
+SCHEMA = pa.schema([
+    *SOURCE_SCHEMA,
+    ("effective_rate_id", pa.int64()),
+    ("rate", pa.float64()),
+    ("amount", pa.float64()),
+    ("month", pa.string()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("month", pa.string()), ("client_id", pa.int64())]), flavor="hive")
+
+
+def read_watermark(out: Path) -> int:
+    path = out / WATERMARK_FILE
+    if not path.exists():
+        return 0
+    return json.loads(path.read_text())["last_id"]
+
+
+def write_watermark(out: Path, last_id: int, rows: int):
+    (out / WATERMARK_FILE).write_text(json.dumps({
+        "last_id": last_id,
+        "rows": rows,
+        "exported_at": datetime.utcnow().isoformat(),
+    }))
+
+
+def record_batches(db, after_id: int, stats: dict):
+    """Arrow batch на каждую порцию строк с id > after_id (по возрастанию id)"""
+    query = export_select(db, TimeEntryFilter()).filter(TimeEntry.id > after_id).order_by(TimeEntry.id)
+    result = db.execute(query.statement, execution_options={"yield_per": CHUNK_SIZE})
+    keys = list(result.keys())
+    status_index = keys.index("status")
+    rates = get_rate_index(db)
+    for rows in result.partitions():
+        columns = [list(column) for column in zip(*rows)]
+        columns[status_index] = [getattr(value, "value", value) for value in columns[status_index]]
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, SOURCE_SCHEMA)],
+            schema=SOURCE_SCHEMA,
+        )
+        resolved = [
+            rates.resolve(row.employee_id, row.contract_id, row.rate_id) or (None, None)
+            for row in rows
+        ]
+        rate_ids = pa.array([rate_id for rate_id, _ in resolved], type=pa.int64())
+        rate_values = pa.array([value for _, value in resolved], type=pa.float64())
+        amount = pc.round(pc.multiply(batch.column("hours"), rate_values), 2)
+        month = pc.strftime(pc.cast(batch.column("date"), pa.timestamp("s")), format="%Y-%m")
+        stats["rows"] += batch.num_rows
+        stats["last_id"] = rows[-1][0]
+        yield pa.RecordBatch.from_arrays([*batch.columns, rate_ids, rate_values, amount, month], schema=SCHEMA)
+
+
+def export(db, out: Path, full: bool) -> dict:
+    out.mkdir(parents=True, exist_ok=True)
+    after_id = 0 if full else read_watermark(out)
+    stats = {"rows": 0, "last_id": after_id}
+    started = time.perf_counter()
+    reader = pa.RecordBatchReader.from_batches(SCHEMA, record_batches(db, after_id, stats))
+    ds.write_dataset(
+        reader,
+        base_dir=str(out),
+        format="parquet",
+        partitioning=PARTITIONING,
+        # Имя файла уникально для запуска — инкрементальные выгрузки не затирают прошлые
+        basename_template=f"part-{after_id}-{{i}}.parquet",
+        existing_data_behavior="delete_matching" if full else "overwrite_or_ignore",
+    )
+    stats["seconds"] = time.perf_counter() - started
+    if stats["rows"]:
+        write_watermark(out, stats["last_id"], stats["rows"])
+    return stats
+
+
+def benchmark_csv(db) -> tuple[int, float]:
+    """Для сравнения: та же выгрузка построчно в CSV (как /api/time-entries/export)"""
+    started = time.perf_counter()
+    size = sum(len(part) for part in iter_csv(iter_export_records(db, TimeEntryFilter())))
+    return size, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, required=True, help="каталог набора данных")
+    parser.add_argument("--full", action="store_true", help="выгрузить всё заново, игнорируя watermark")
+    parser.add_argument("--benchmark", action="store_true", help="дополнительно замерить CSV-выгрузку")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"📦 Выгрузка таймшитов в {args.out} ({'полная' if args.full else 'инкрементальная'})...")
+        stats = export(db, args.out, args.full)
+        if not stats["rows"]:
+            print("✅ Новых записей нет")
+            return
+        size = sum(f.stat().st_size for f in args.out.rglob("*.parquet"))
+        rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0
+        print(f"✅ Строк: {stats['rows']:,}, последний id: {stats['last_id']}")
+        print(f"   ⏱️  {stats['seconds']:.2f}s ({rate:,.0f} строк/с), Parquet в каталоге: {size / 1e6:.1f} MB")
+
+        if args.benchmark:
+            csv_size, csv_seconds = benchmark_csv(db)
+            print(f"   📄 CSV для сравнения: {csv_seconds:.2f}s, {csv_size / 1e6:.1f} MB")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
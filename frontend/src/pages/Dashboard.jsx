@@ -62,20 +62,20 @@ const Dashboard = () => {
 
   const fetchDashboardData = async () => {
     try {
-      const [entriesResponse] = await Promise.all([
-        api.get('/time-entries?limit=10'),
+      // Итоги считает сервер (GROUP BY по статусу), список — только последние записи
+      const [entriesResponse, reportResponse] = await Promise.all([
+        api.get('/time-entries?limit=5'),
+        api.get('/reports/hours', { params: { group_by: 'status' } }),
       ])
 
       const entries = Array.isArray(entriesResponse.data) ? entriesResponse.data : []
-      const totalHours = entries.reduce((sum, entry) => sum + (entry.hours || 0), 0)
-      const pendingEntries = entries.filter((e) => e.status === 'draft').length
-      const approvedEntries = entries.filter((e) => e.status === 'approved').length
+      const totals = reportResponse.data?.totals || {}
 
       setStats({
-        totalHours: totalHours.toFixed(1),
-        totalEntries: entries.length,
-        pendingEntries,
-        approvedEntries,
+        totalHours: (totals.hours || 0).toFixed(1),
+        totalEntries: totals.entries || 0,
+        pendingEntries: totals.draft_entries || 0,
+        approvedEntries: totals.approved_entries || 0,
       })
       setRecentEntries(entries.slice(0, 5))
     } catch (error) {
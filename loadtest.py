@@ -0,0 +1,136 @@
+"""Нагрузочный тест API: задержки p50/p95/p99 при высокой конкурентности
+
+Сравнивает синхронный и асинхронный стек (ASYNC_DB_ENABLED): для каждого
+режима поднимает uvicorn на свободном порту, прогревает и обстреливает
+маршруты клиентов, дел и таймшитов. Запросы идут от имени сотрудника
+--email (JWT подписывается локально тем же SECRET_KEY).
+
+    python loadtest.py --email admin@legaltime.ru
+    python loadtest.py --email admin@legaltime.ru --concurrency 500 --requests 20000
+    python loadtest.py --url http://127.0.0.1:8000 --email ...   # уже запущенный сервер
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from pathlib import Path
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+from app.utils.auth import create_access_token
+
+PATHS = [
+    "/api/time-entries/?limit=50",
+    "/api/time-entries/all?limit=100&sort=-hours",
+    "/api/matters/?limit=100",
+    "/api/clients/?limit=100",
+]
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+async def run_load(url: str, token: str, concurrency: int, requests: int, timeout: float) -> dict:
+    latencies = []
+    errors = 0
+    queue = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, cookies={"access_token": token}, limits=limits, timeout=timeout) as client:
+        async def worker():
+            nonlocal errors
+            for i in queue:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(PATHS[i % len(PATHS)])
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        # Прогрев: пул соединений с базой, индекс ставок
+        for path in PATHS:
+            await client.get(path)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "rps": requests / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+        "errors": errors,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app: str, async_db: bool, workers: int) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = {**os.environ, "ASYNC_DB_ENABLED": "true" if async_db else "false"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=project_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(url + "/docs", timeout=1)
+            return process, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"uvicorn {app} не запустился")
+
+
+def print_stats(label: str, stats: dict):
+    print(
+        f"   {label:<8} {stats['rps']:8,.0f} req/s   p50 {stats['p50'] * 1000:7.1f} ms   "
+        f"p95 {stats['p95'] * 1000:7.1f} ms   p99 {stats['p99'] * 1000:7.1f} ms   "
+        f"max {stats['max'] * 1000:7.1f} ms   ошибок {stats['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True, help="сотрудник, от имени которого идут запросы")
+    parser.add_argument("--url", help="адрес запущенного сервера (без сравнения режимов)")
+    parser.add_argument("--app", default="app.main:app")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--timeout", type=float, default=10.0, help="таймаут запроса, с (превышение — ошибка)")
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": args.email})
+    print(f"🚀 {args.requests:,} запросов, конкурентность {args.concurrency}")
+
+    if args.url:
+        print_stats("сервер", asyncio.run(run_load(args.url, token, args.concurrency, args.requests, args.timeout)))
+        return
+
+    for label, async_db in (("sync", False), ("async", True)):
+        process, url = start_server(args.app, async_db, args.workers)
+        try:
+            print_stats(label, asyncio.run(run_load(url, token, args.concurrency, args.requests, args.timeout)))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
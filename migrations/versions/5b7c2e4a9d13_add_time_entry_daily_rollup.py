@@ -0,0 +1,59 @@
+"""Add time_entry_daily_rollup
+
+Revision ID: 5b7c2e4a9d13
+Revises: 9e5a98edc8a3
+Create Date: 2026-10-17 16:40:12.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7c2e4a9d13'
+down_revision: Union[str, None] = '9e5a98edc8a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Тип timeentrystatus уже создан вместе с time_entries
+    status_type = postgresql.ENUM('draft', 'approved', name='timeentrystatus', create_type=False) \
+        if op.get_bind().dialect.name == 'postgresql' else sa.Enum('draft', 'approved', name='timeentrystatus')
+    op.create_table('time_entry_daily_rollup',
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('matter_id', sa.Integer(), nullable=False),
+    sa.Column('activity_type_id', sa.Integer(), nullable=False),
+    sa.Column('status', status_type, nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('hours', sa.Float(), nullable=False),
+    sa.Column('entries', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['activity_type_id'], ['activity_types.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['matter_id'], ['matters.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('employee_id', 'matter_id', 'activity_type_id', 'status', 'date', name='uq_time_entry_daily_rollup_key')
+    )
+    op.create_index(op.f('ix_time_entry_daily_rollup_id'), 'time_entry_daily_rollup', ['id'], unique=False)
+    op.create_index('ix_time_entry_daily_rollup_date', 'time_entry_daily_rollup', ['date'], unique=False)
+    op.create_index('ix_time_entry_daily_rollup_matter_id_date', 'time_entry_daily_rollup', ['matter_id', 'date'], unique=False)
+
+    # Первичное заполнение из существующих таймшитов
+    op.execute(
+        "INSERT INTO time_entry_daily_rollup "
+        "(employee_id, matter_id, activity_type_id, status, date, hours, entries) "
+        "SELECT employee_id, matter_id, activity_type_id, status, date, SUM(hours), COUNT(id) "
+        "FROM time_entries WHERE status IS NOT NULL "
+        "GROUP BY employee_id, matter_id, activity_type_id, status, date"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_time_entry_daily_rollup_matter_id_date', table_name='time_entry_daily_rollup')
+    op.drop_index('ix_time_entry_daily_rollup_date', table_name='time_entry_daily_rollup')
+    op.drop_index(op.f('ix_time_entry_daily_rollup_id'), table_name='time_entry_daily_rollup')
+    op.drop_table('time_entry_daily_rollup')
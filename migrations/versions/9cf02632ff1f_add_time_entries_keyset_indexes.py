@@ -0,0 +1,28 @@
+"""Add time_entries keyset pagination indexes
+
+Revision ID: 9cf02632ff1f
+Revises: 2e1891ce2989
+Create Date: 2026-10-17 13:26:07.914230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9cf02632ff1f'
+down_revision: Union[str, None] = '2e1891ce2989'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_time_entries_employee_id_date_id', 'time_entries', ['employee_id', 'date', 'id'], unique=False)
+    op.create_index('ix_time_entries_date_id', 'time_entries', ['date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_time_entries_date_id', table_name='time_entries')
+    op.drop_index('ix_time_entries_employee_id_date_id', table_name='time_entries')
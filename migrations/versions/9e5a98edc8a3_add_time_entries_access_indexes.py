@@ -0,0 +1,59 @@
+"""Add time_entries access pattern indexes
+
+Revision ID: 9e5a98edc8a3
+Revises: 9cf02632ff1f
+Create Date: 2026-10-17 14:02:51.330178
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5a98edc8a3'
+down_revision: Union[str, None] = '9cf02632ff1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# На PostgreSQL индексы строятся CONCURRENTLY, чтобы не блокировать запись
+# в time_entries. CREATE INDEX CONCURRENTLY нельзя выполнять в транзакции,
+# поэтому миграция работает в autocommit_block. Если построение прервётся,
+# останется индекс в состоянии INVALID — его нужно удалить и повторить миграцию.
+
+UNSYNCED = sa.text('google_event_id IS NULL')
+SYNCED = sa.text('google_event_id IS NOT NULL')
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_time_entries_employee_id_unsynced', 'time_entries', ['employee_id', 'id'],
+            unique=False, postgresql_concurrently=True,
+            postgresql_where=UNSYNCED, sqlite_where=UNSYNCED,
+        )
+        op.create_index(
+            'ix_time_entries_employee_id_google_event_id', 'time_entries', ['employee_id', 'google_event_id'],
+            unique=False, postgresql_concurrently=True,
+            postgresql_where=SYNCED, sqlite_where=SYNCED,
+        )
+        op.create_index(
+            'ix_time_entries_matter_id_date', 'time_entries', ['matter_id', 'date'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_time_entries_status_date', 'time_entries', ['status', 'date'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in (
+            'ix_time_entries_status_date',
+            'ix_time_entries_matter_id_date',
+            'ix_time_entries_employee_id_google_event_id',
+            'ix_time_entries_employee_id_unsynced',
+        ):
+            op.drop_index(name, table_name='time_entries', postgresql_concurrently=True)
@@ -0,0 +1,47 @@
+"""Add calendar_outbox
+
+Revision ID: c3010d9d35ef
+Revises: e1d0076c73a2, e4cd5cddcaa1
+Create Date: 2026-10-17 10:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+# Ревизия заодно сливает две ветки, выросшие из d57998674c8a
+revision: str = 'c3010d9d35ef'
+down_revision: Union[str, None] = ('e1d0076c73a2', 'e4cd5cddcaa1')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('calendar_outbox',
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('time_entry_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.Enum('upsert', 'delete', name='outboxoperation'), nullable=False),
+    sa.Column('google_event_id', sa.String(), nullable=True),
+    sa.Column('status', sa.Enum('pending', 'done', 'failed', 'skipped', name='outboxstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_retry_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_calendar_outbox_id'), 'calendar_outbox', ['id'], unique=False)
+    op.create_index('ix_calendar_outbox_status_employee_id', 'calendar_outbox', ['status', 'employee_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_calendar_outbox_status_employee_id', table_name='calendar_outbox')
+    op.drop_index(op.f('ix_calendar_outbox_id'), table_name='calendar_outbox')
+    op.drop_table('calendar_outbox')
+    sa.Enum(name='outboxstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='outboxoperation').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,63 @@
+"""Обслуживание дневной свёртки таймшитов (time_entry_daily_rollup)
+
+    python rollup_time_entries.py check     # сверить свёртку с time_entries
+    python rollup_time_entries.py rebuild   # пересчитать свёртку с нуля
+
+check завершается с кодом 1, если найдены расхождения.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.database import SessionLocal
+from app.models import *  # noqa: F401,F403
+from app.crud.time_entry_daily_rollup import time_entry_daily_rollup
+
+
+def rebuild(db) -> int:
+    print("🔄 Пересчёт дневной свёртки...")
+    started = time.perf_counter()
+    rows = time_entry_daily_rollup.rebuild(db)
+    print(f"✅ Строк в свёртке: {rows:,} ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+def check(db, limit: int) -> int:
+    print("🔎 Сверка дневной свёртки с time_entries...")
+    mismatches = time_entry_daily_rollup.check(db, limit=limit)
+    if not mismatches:
+        print("✅ Расхождений нет")
+        return 0
+    print(f"❌ Расхождений: {len(mismatches)}{'+' if len(mismatches) >= limit else ''}")
+    for mismatch in mismatches:
+        key = ", ".join(f"{name}={value}" for name, value in mismatch["key"].items())
+        expected, actual = mismatch["expected"], mismatch["actual"]
+        print(
+            f"   {key}: ожидалось {expected['hours']}ч/{expected['entries']}, "
+            f"в свёртке {actual['hours']}ч/{actual['entries']}"
+        )
+    print("\n💡 Исправить: python rollup_time_entries.py rebuild")
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--limit", type=int, default=100, help="сколько расхождений показать")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            return rebuild(db)
+        return check(db, args.limit)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
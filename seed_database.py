@@ -17,6 +17,7 @@ try:
     from app.models.activity_type import ActivityType
     from app.models.rate import Rate
     from app.models.time_entry import TimeEntry, TimeEntryStatus
+    from app.crud.time_entry_daily_rollup import time_entry_daily_rollup
     from app.utils.auth import get_password_hash
     from sqlalchemy import text
 except ImportError as e:
@@ -33,6 +34,7 @@ def clear_database(db):
     
     try:
         # Удаляем данные в правильном порядке из-за внешних ключей
+        db.execute(text("DELETE FROM time_entry_daily_rollup"))
         db.execute(text("DELETE FROM time_entries"))
         db.execute(text("DELETE FROM rates"))
         db.execute(text("DELETE FROM matters"))
@@ -277,7 +279,6 @@ def seed_time_entries(db, employees, matters, activity_types, rates):
             for _ in range(random.randint(3, 5)):
                 matter = random.choice(matters)
                 activity = random.choice(activity_types)
-                rate = random.choice([r for r in rates if r.employee_id == employee.id or r.contract_id == matter.contract_id] + [None])
                 
                 entry_date = week_start - timedelta(days=random.randint(0, 6))
                 hours = round(random.uniform(0.5, 8.0), 2)
@@ -287,7 +288,7 @@ def seed_time_entries(db, employees, matters, activity_types, rates):
                     employee_id=employee.id,
                     matter_id=matter.id,
                     activity_type_id=activity.id,
-                    rate_id=rate.id if rate else None,
+                    rate_id=None,  # ставку определяет app/utils/rates.py
                     hours=hours,
                     description=random.choice(descriptions),
                     date=entry_date,
@@ -323,6 +324,8 @@ def main():
         matters = seed_matters(db, contracts)
         rates = seed_rates(db, employees, contracts)
         time_entries = seed_time_entries(db, employees, matters, activity_types, rates)
+        # Таймшиты добавлены напрямую, мимо CRUD — пересчитываем дневную свёртку
+        time_entry_daily_rollup.rebuild(db)
         
         print("\n" + "=" * 60)
         print("✅ База данных успешно заполнена!")
@@ -0,0 +1,81 @@
+"""
+Общие настройки тестов.
+
+Приложение читает настройки при импорте, поэтому окружение задаётся здесь,
+до импорта app. Тесты на SQLite создают свою базу во временном каталоге;
+EXPLAIN-проверки (test_time_entries.py) используют PostgreSQL из TEST_DATABASE_URL.
+"""
+import os
+import tempfile
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+if TEST_DATABASE_URL.startswith("postgresql"):
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+else:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "legaltime.db")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test")
+os.environ.setdefault("FERNET_KEY", "")
+os.environ["CELERY_TASK_ALWAYS_EAGER"] = "true"
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    """URL пустой SQLite-базы со схемой из моделей"""
+    from sqlalchemy import create_engine
+    from app.database import Base
+    import app.models  # noqa: F401 — регистрирует таблицы в Base.metadata
+
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def sqlite_db(sqlite_url):
+    """Синхронная сессия на SQLite-базе теста"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.utils.rates import invalidate_rate_index
+
+    engine = create_engine(sqlite_url)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    invalidate_rate_index()
+    yield session
+    session.close()
+    engine.dispose()
+    invalidate_rate_index()
+
+
+@pytest.fixture
+def refs(sqlite_db):
+    """Минимальные справочники: админ, юрист, клиент, договор, дело, вид работ, ставка"""
+    from datetime import date
+    from app.models.activity_type import ActivityType
+    from app.models.client import Client
+    from app.models.contract import Contract
+    from app.models.employee import Employee
+    from app.models.matter import Matter
+    from app.models.rate import Rate
+
+    admin = Employee(name="Admin", email="admin@legaltime.test", password_hash="x", role="admin")
+    lawyer = Employee(name="Lawyer", email="lawyer@legaltime.test", password_hash="x", role="lawyer")
+    client = Client(name="Client", type="legal")
+    sqlite_db.add_all([admin, lawyer, client])
+    sqlite_db.flush()
+    contract = Contract(client_id=client.id, number="C-1", date=date(2024, 1, 1))
+    sqlite_db.add(contract)
+    sqlite_db.flush()
+    matter = Matter(contract_id=contract.id, code="M-1", name="Matter")
+    activity = ActivityType(name="Consultation")
+    sqlite_db.add_all([matter, activity, Rate(value=400.0, contract_id=contract.id)])
+    sqlite_db.commit()
+    return {
+        "admin": admin, "lawyer": lawyer, "client": client,
+        "contract": contract, "matter": matter, "activity": activity,
+    }
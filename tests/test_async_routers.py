@@ -0,0 +1,126 @@
+"""
+Async-стек (ASYNC_DB_ENABLED) на aiosqlite: get_async_db, AsyncCRUDBase
+и async-роутеры клиентов, дел и таймшитов.
+"""
+import asyncio
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import AsyncSessionLocal
+from app.routers import client_async, matter_async, time_entry_async
+from app.utils.auth import create_access_token
+from app.utils.rates import invalidate_rate_index
+
+
+@pytest.fixture
+def api(sqlite_url, refs, monkeypatch):
+    """Запустить сценарий scenario(client) против async-роутеров"""
+    monkeypatch.setattr(time_entry_async, "enqueue_calendar_sync", lambda employee_id: None)
+    app = FastAPI()
+    for module in (client_async, matter_async, time_entry_async):
+        app.include_router(module.router, prefix="/api")
+    token = create_access_token({"sub": refs["admin"].email})
+
+    def run(scenario, timeout: float = 30):
+        result = {}
+
+        async def main():
+            engine = create_async_engine(sqlite_url.replace("sqlite://", "sqlite+aiosqlite://"))
+            # Роутеры получают сессию через настоящий get_async_db
+            AsyncSessionLocal.configure(bind=engine)
+            transport = httpx.ASGITransport(app=app)
+            try:
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://test", cookies={"access_token": token}
+                ) as client:
+                    result["value"] = await scenario(client)
+            finally:
+                await engine.dispose()
+                AsyncSessionLocal.configure(bind=None)
+
+        # Отдельный поток: если цикл событий заблокируется, тест упадёт по таймауту, а не зависнет
+        thread = threading.Thread(target=lambda: result.update(error=_run_catching(main)), daemon=True)
+        thread.start()
+        thread.join(timeout)
+        assert not thread.is_alive(), "event loop is blocked"
+        if result.get("error"):
+            raise result["error"]
+        return result["value"]
+
+    return run
+
+
+def _run_catching(main):
+    try:
+        asyncio.run(main())
+    except Exception as e:  # noqa: BLE001 — пробрасывается в основной поток
+        return e
+    return None
+
+
+def test_clients_crud(api):
+    async def scenario(client):
+        created = await client.post("/api/clients/", json={"name": "Async", "type": "legal"})
+        assert created.status_code == 201
+        client_id = created.json()["id"]
+        updated = await client.put(f"/api/clients/{client_id}", json={"name": "Async 2", "type": "physical"})
+        page = await client.get("/api/clients/", params={"limit": 1})
+        busy = await client.delete("/api/clients/1")  # у первого клиента есть договор
+        deleted = await client.delete(f"/api/clients/{client_id}")
+        missing = await client.get(f"/api/clients/{client_id}")
+        return created, updated, page, busy, deleted, missing
+
+    created, updated, page, busy, deleted, missing = api(scenario)
+    assert updated.json()["name"] == "Async 2"
+    assert len(page.json()) == 1 and page.headers.get("x-next-cursor")
+    assert busy.status_code == 400
+    assert deleted.status_code == 200
+    assert missing.status_code == 404
+
+
+def test_matters_and_time_entries(api, refs):
+    matter_id, activity_id = refs["matter"].id, refs["activity"].id
+
+    async def scenario(client):
+        matters = await client.get("/api/matters/")
+        created = await client.post("/api/time-entries/", json={
+            "matter_id": matter_id, "activity_type_id": activity_id, "hours": 1.5, "date": "2026-01-05",
+        })
+        entry_id = created.json()["id"]
+        updated = await client.put(f"/api/time-entries/{entry_id}", json={
+            "matter_id": matter_id, "activity_type_id": activity_id, "hours": 2.5, "date": "2026-01-05",
+        })
+        approved = await client.patch(f"/api/time-entries/{entry_id}/approve")
+        listed = await client.get("/api/time-entries/", params={"sort": "-hours"})
+        deleted = await client.delete(f"/api/time-entries/{entry_id}")
+        missing = await client.get(f"/api/time-entries/{entry_id}")
+        return matters, created, updated, approved, listed, deleted, missing
+
+    matters, created, updated, approved, listed, deleted, missing = api(scenario)
+    assert [m["code"] for m in matters.json()] == ["M-1"]
+    assert created.status_code == 201
+    assert created.json()["effective_rate"] == 400.0 and created.json()["amount"] == 600.0
+    assert updated.json()["hours"] == 2.5
+    assert approved.json()["status"] == "approved"
+    assert [e["id"] for e in listed.json()] == [created.json()["id"]]
+    assert deleted.status_code == 200
+    assert missing.status_code == 404
+
+
+def test_concurrent_requests_with_cold_rate_index(api, refs):
+    """Загрузка индекса ставок не должна блокировать цикл событий"""
+    matter_id, activity_id = refs["matter"].id, refs["activity"].id
+
+    async def scenario(client):
+        await client.post("/api/time-entries/", json={
+            "matter_id": matter_id, "activity_type_id": activity_id, "hours": 1, "date": "2026-01-05",
+        })
+        invalidate_rate_index()
+        return await asyncio.gather(*(client.get("/api/time-entries/") for _ in range(5)))
+
+    responses = api(scenario, timeout=15)
+    assert all(r.status_code == 200 and r.json()[0]["effective_rate"] == 400.0 for r in responses)
@@ -0,0 +1,146 @@
+"""
+Регрессионные проверки индексов time_entries.
+
+Запросы роутеров таймшитов выполняются на большом сгенерированном наборе
+данных, и для каждого SQL-запроса снимается EXPLAIN. Тест падает, если
+планировщик выбрал последовательное сканирование time_entries.
+
+Нужен PostgreSQL: TEST_DATABASE_URL=postgresql+psycopg2://... pytest tests/
+(таблицы в этой базе пересоздаются).
+"""
+import os
+from datetime import date
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+if not TEST_DATABASE_URL.startswith("postgresql"):
+    pytest.skip("EXPLAIN-проверки требуют PostgreSQL в TEST_DATABASE_URL", allow_module_level=True)
+
+# DATABASE_URL = TEST_DATABASE_URL выставляет conftest.py
+
+from sqlalchemy import event, text  # noqa: E402
+from app.database import Base, engine, SessionLocal  # noqa: E402
+from app.models import *  # noqa: E402,F401,F403
+from app.models.time_entry import TimeEntry  # noqa: E402
+from app.crud.time_entry import time_entry as crud_time_entry  # noqa: E402
+from app.schemas.time_entry import TimeEntryListFilter  # noqa: E402
+
+SEED_EMPLOYEES = 100
+SEED_MATTERS = 200
+SEED_ENTRIES = 200_000
+EMPLOYEE_ID = 7
+
+
+@pytest.fixture(scope="module")
+def db():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO employees (id, name, email, password_hash, role) "
+            "SELECT i, 'Employee ' || i, 'employee' || i || '@legaltime.test', 'x', 'lawyer' "
+            f"FROM generate_series(1, {SEED_EMPLOYEES}) AS i"
+        ))
+        conn.execute(text(
+            "INSERT INTO clients (id, name, type) "
+            "SELECT i, 'Client ' || i, 'legal' FROM generate_series(1, 20) AS i"
+        ))
+        conn.execute(text(
+            "INSERT INTO contracts (id, client_id, number, date) "
+            "SELECT i, 1 + i % 20, 'C-' || i, DATE '2024-01-01' FROM generate_series(1, 50) AS i"
+        ))
+        conn.execute(text(
+            "INSERT INTO matters (id, contract_id, code, name) "
+            f"SELECT i, 1 + i % 50, 'M-' || i, 'Matter ' || i FROM generate_series(1, {SEED_MATTERS}) AS i"
+        ))
+        conn.execute(text(
+            "INSERT INTO activity_types (id, name) "
+            "SELECT i, 'Activity ' || i FROM generate_series(1, 10) AS i"
+        ))
+        # Большинство записей уже в календаре, каждая 50-я ещё не выгружена
+        conn.execute(text(
+            "INSERT INTO time_entries "
+            "(id, employee_id, matter_id, activity_type_id, hours, date, status, google_event_id) "
+            f"SELECT i, 1 + i % {SEED_EMPLOYEES}, 1 + i % {SEED_MATTERS}, 1 + i % 10, "
+            "0.5 + (i % 16) * 0.5, DATE '2024-01-01' + (i % 730), "
+            "CASE WHEN i % 3 = 0 THEN 'approved' ELSE 'draft' END::timeentrystatus, "
+            "CASE WHEN i % 50 = 0 THEN NULL ELSE 'ev-' || i END "
+            f"FROM generate_series(1, {SEED_ENTRIES}) AS i"
+        ))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+    session = SessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+def _captured_statements(run, db):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return [(s, p) for s, p in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+def _seq_scanned_relations(plan: dict) -> set[str]:
+    found = set()
+    if plan.get("Node Type") == "Seq Scan":
+        found.add(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found |= _seq_scanned_relations(child)
+    return found
+
+
+def _second_page(db):
+    query = db.query(TimeEntry).filter(TimeEntry.employee_id == EMPLOYEE_ID)
+    _, cursor = crud_time_entry.get_page(db, limit=100, query=query)
+    return crud_time_entry.get_page(db, cursor=cursor, limit=100, query=query)
+
+
+ROUTER_QUERIES = {
+    "read_my_time_entries": lambda db: crud_time_entry.get_page(
+        db, limit=100, query=db.query(TimeEntry).filter(TimeEntry.employee_id == EMPLOYEE_ID)
+    ),
+    "read_my_time_entries (cursor)": _second_page,
+    "read_all_time_entries": lambda db: crud_time_entry.get_page(db, limit=100),
+    "read_my_time_entries (period)": lambda db: crud_time_entry.get_filtered_page(
+        db, TimeEntryListFilter(employee_id=EMPLOYEE_ID, date_from=date(2024, 3, 1), date_to=date(2024, 3, 31))
+    ),
+    "read_all_time_entries (matter)": lambda db: crud_time_entry.get_filtered_page(
+        db, TimeEntryListFilter(matter_id=17, sort="date")
+    ),
+    "read_all_time_entries (client)": lambda db: crud_time_entry.get_filtered_page(
+        db, TimeEntryListFilter(client_id=3, date_from=date(2024, 6, 1))
+    ),
+    "read_all_time_entries (status)": lambda db: crud_time_entry.get_filtered_page(
+        db, TimeEntryListFilter(status="approved", date_from=date(2025, 12, 1))
+    ),
+    "sync_all_entries_to_calendar": lambda db: crud_time_entry.get_unsynced_with_refs(db, EMPLOYEE_ID),
+    "calendar reconciliation": lambda db: crud_time_entry.get_by_event_ids(
+        db, EMPLOYEE_ID, ["ev-7", "ev-107", "ev-missing"]
+    ),
+    "get_calendar_events": lambda db: crud_time_entry.get_synced_with_refs(
+        db, EMPLOYEE_ID, date(2024, 6, 1), date(2024, 7, 31), 50
+    ),
+}
+
+
+@pytest.mark.parametrize("name", list(ROUTER_QUERIES))
+def test_router_queries_avoid_seq_scan_on_time_entries(db, name):
+    statements = _captured_statements(ROUTER_QUERIES[name], db)
+    assert statements, f"{name}: no SQL captured"
+
+    for statement, parameters in statements:
+        with engine.connect() as conn:
+            plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        scanned = _seq_scanned_relations(plan[0]["Plan"])
+        assert "time_entries" not in scanned, f"{name}: sequential scan on time_entries\n{statement}"